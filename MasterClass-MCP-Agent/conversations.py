@@ -0,0 +1,191 @@
+"""
+대화 세션 관리
+클라이언트(연결 또는 세션 ID)마다 대화 기록을 분리하고, 세션 수와 세션별 기록 크기를 제한합니다.
+모델에 보내는 기록은 토큰 예산 안의 최근 턴으로 잘라냅니다.
+"""
+
+import asyncio
+import json
+import math
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # 선택적 의존성: 없으면 UTF-8 바이트 수로 토큰 수를 추정합니다.
+    tiktoken = None
+
+# 메시지마다 역할/구분자에 드는 토큰 수 (OpenAI 채팅 형식 기준 근사값)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:  # 인코딩 파일을 받을 수 없는 환경에서는 추정치를 사용합니다.
+            _encoding = False
+    return _encoding or None
+
+
+def message_size(message: Dict[str, Any]) -> int:
+    """메시지의 대략적인 크기(문자 수). 기록 상한 계산에 사용합니다."""
+    return len(json.dumps(message, ensure_ascii=False, default=str))
+
+
+def system_prefix_length(messages: List[Dict[str, Any]]) -> int:
+    """기록 앞쪽의 연속된 system 메시지 개수. 이 메시지들은 잘라내지 않습니다."""
+    head = 0
+    while head < len(messages) and messages[head].get("role") == "system":
+        head += 1
+    return head
+
+
+def count_tokens(message: Dict[str, Any]) -> int:
+    """메시지의 토큰 수. 본문과 도구 호출(이름, 인자)을 셉니다."""
+    content = message.get("content") or ""
+    parts = [content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)]
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call.get("function") or {}
+        parts += [function.get("name") or "", function.get("arguments") or ""]
+    text = "".join(parts)
+    encoding = _get_encoding()
+    tokens = len(encoding.encode(text)) if encoding else math.ceil(len(text.encode("utf-8")) / 4)
+    return tokens + MESSAGE_OVERHEAD_TOKENS
+
+
+@dataclass
+class Conversation:
+    """한 클라이언트의 대화 기록. run_query에 세션 핸들로 전달됩니다."""
+    id: str
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    created_at: float = field(default_factory=time.monotonic)
+    last_active: float = field(default_factory=time.monotonic)
+    size: int = 0
+    # 메시지별 토큰 수 (messages와 같은 순서). 추가할 때 한 번만 셉니다.
+    token_counts: List[int] = field(default_factory=list)
+    # 같은 대화의 질의는 순서대로 처리합니다.
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    def append(self, message: Dict[str, Any]) -> None:
+        self.messages.append(message)
+        self.size += message_size(message)
+        self.token_counts.append(count_tokens(message))
+
+    @property
+    def tokens(self) -> int:
+        return sum(self.token_counts)
+
+
+class ConversationManager:
+    """
+    세션 ID별 대화를 LRU 순서로 보관합니다.
+    - `max_sessions`를 넘으면 가장 오래 사용되지 않은 대화부터 제거합니다.
+    - `idle_timeout`초 동안 사용되지 않은 대화는 제거합니다.
+    - 대화 기록이 `max_messages`개 또는 `max_chars`자를 넘으면 가장 오래된 턴(사용자 메시지부터
+      다음 사용자 메시지 직전까지)을 통째로 버려 도구 호출/결과 쌍이 깨지지 않게 합니다.
+    - `window()`는 기록을 지우지 않고, 모델에 보낼 부분만 `token_budget` 안으로 고릅니다.
+    """
+
+    def __init__(self, max_sessions: int = 500, idle_timeout: float = 1800.0, max_messages: int = 200, max_chars: int = 200_000, token_budget: int = 8000):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.max_chars = max_chars
+        self.token_budget = token_budget
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+        self.evicted = 0
+        # 토큰 예산 때문에 오래된 턴을 빼고 보낸 횟수
+        self.windowed = 0
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def get(self, session_id: Optional[str] = None) -> Conversation:
+        """세션 ID의 대화를 반환합니다. 없으면 새로 만듭니다."""
+        self.evict_idle()
+        session_id = session_id or uuid.uuid4().hex
+        conversation = self._conversations.get(session_id)
+        if conversation is None:
+            conversation = self._conversations[session_id] = Conversation(id=session_id)
+            while len(self._conversations) > self.max_sessions:
+                self._conversations.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._conversations.move_to_end(session_id)
+        conversation.last_active = time.monotonic()
+        return conversation
+
+    def end(self, session_id: str) -> None:
+        self._conversations.pop(session_id, None)
+
+    def evict_idle(self) -> int:
+        """유휴 대화를 제거하고 제거한 개수를 반환합니다."""
+        deadline = time.monotonic() - self.idle_timeout
+        removed = 0
+        # LRU 순서이므로 앞에서부터 유휴 대화만 확인하면 됩니다.
+        while self._conversations:
+            session_id, conversation = next(iter(self._conversations.items()))
+            if conversation.last_active > deadline or conversation.lock.locked():
+                break
+            del self._conversations[session_id]
+            removed += 1
+        self.evicted += removed
+        return removed
+
+    def trim(self, conversation: Conversation) -> None:
+        """대화 기록이 상한을 넘으면 가장 오래된 턴부터 버립니다. 앞쪽 system 메시지와 마지막 턴은 유지합니다."""
+        messages = conversation.messages
+        head = system_prefix_length(messages)
+        while len(messages) > self.max_messages or conversation.size > self.max_chars:
+            # 첫 턴 다음의 사용자 메시지 위치 = 첫 턴의 끝
+            next_turn = next((i for i in range(head + 1, len(messages)) if messages[i].get("role") == "user"), None)
+            if next_turn is None:
+                break
+            conversation.size -= sum(message_size(message) for message in messages[head:next_turn])
+            del messages[head:next_turn]
+            del conversation.token_counts[head:next_turn]
+
+    def window(self, conversation: Conversation) -> List[Dict[str, Any]]:
+        """
+        토큰 예산 안에 들어가는 메시지 목록을 반환합니다.
+        앞쪽 system 메시지와 마지막 턴은 항상 포함하고, 그 앞의 턴은 최신 순으로 예산이 허락하는 만큼
+        통째로 포함합니다. `token_budget`이 0 이하이면 전체 기록을 반환합니다.
+        """
+        messages, counts = conversation.messages, conversation.token_counts
+        total = sum(counts)
+        if self.token_budget <= 0 or total <= self.token_budget:
+            return messages
+
+        head = system_prefix_length(messages)
+        used = sum(counts[:head])
+        start = len(messages)
+        turn_tokens = 0
+        for i in range(len(messages) - 1, head - 1, -1):
+            turn_tokens += counts[i]
+            if messages[i].get("role") != "user":
+                continue
+            if start < len(messages) and used + turn_tokens > self.token_budget:
+                break
+            used += turn_tokens
+            turn_tokens = 0
+            start = i
+        self.windowed += 1
+        return messages[:head] + messages[start:]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._conversations),
+            "evicted": self.evicted,
+            "messages": sum(len(c.messages) for c in self._conversations.values()),
+            "chars": sum(c.size for c in self._conversations.values()),
+            "tokens": sum(c.tokens for c in self._conversations.values()),
+            "token_budget": self.token_budget,
+            "windowed": self.windowed,
+        }
@@ -0,0 +1,120 @@
+"""
+MCP 서버 연결 관리
+각 서버 연결을 전용 태스크에서 열고 닫아, 여러 서버를 동시에 시작할 수 있게 합니다.
+"""
+
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Dict, Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+SUPPORTED_TRANSPORTS = ("stdio", "sse", "streamable-http")
+
+
+async def open_transport(stack: AsyncExitStack, config: Dict[str, Any]):
+    """설정에 맞는 전송을 열고 (read, write) 스트림을 반환합니다."""
+    transport = config.get("transport", "stdio")
+    if transport == "stdio":
+        server_params = StdioServerParameters(
+            command=config["command"],
+            args=config.get("args", []),
+            env=config.get("env")
+        )
+        return await stack.enter_async_context(stdio_client(server_params))
+    if transport == "sse":
+        # 여러 에이전트가 이미 실행 중인 서버 하나(와 그 캐시)를 공유합니다.
+        return await stack.enter_async_context(sse_client(config["url"]))
+    if transport == "streamable-http":
+        read, write, _ = await stack.enter_async_context(streamablehttp_client(config["url"]))
+        return read, write
+    raise ValueError(f"지원하지 않는 전송 방식 '{transport}'")
+
+
+class ServerConnection:
+    """
+    MCP 서버 하나와의 연결.
+    전송과 세션은 anyio 취소 범위 규칙상 연 태스크에서 닫아야 하므로, 연결마다 전용 태스크가
+    열고, 종료 요청을 기다렸다가 닫습니다.
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any], message_handler=None):
+        self.name = name
+        self.config = config
+        self.transport = config.get("transport", "stdio")
+        self.message_handler = message_handler
+        self.session: Optional[ClientSession] = None
+        self._ready: Optional[asyncio.Future] = None
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        try:
+            async with AsyncExitStack() as stack:
+                read, write = await open_transport(stack, self.config)
+                session = await stack.enter_async_context(
+                    ClientSession(read, write, message_handler=self.message_handler)
+                )
+                await session.initialize()
+                self.session = session
+                self._ready.set_result(session)
+                await self._closing.wait()
+        except asyncio.CancelledError:
+            self._ready.cancel()
+            raise
+        except BaseException as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+        finally:
+            self.session = None
+
+    async def start(self, timeout: float) -> ClientSession:
+        """연결과 초기화를 `timeout`초 안에 마칩니다. 시간을 넘기면 연결을 정리하고 TimeoutError를 발생시킵니다."""
+        self._ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(), name=f"mcp-server-{self.name}")
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._ready), timeout=timeout)
+        except BaseException:
+            self._task.cancel()
+            try:
+                await self._task
+            except BaseException:
+                pass
+            raise
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._closing.set()
+        try:
+            await self._task
+        except BaseException:
+            pass
+        self._task = None
+
+
+async def connect_server(name: str, config: Dict[str, Any], timeout: float, message_handler=None):
+    """
+    서버 하나에 연결하고 (연결 또는 None, 시작 보고 항목)을 반환합니다.
+    실패는 보고 항목에만 기록되어 다른 서버의 시작에 영향을 주지 않습니다.
+    """
+    connection = ServerConnection(name, config, message_handler)
+    report = {"server": name, "transport": connection.transport, "status": "connected", "seconds": 0.0, "error": None}
+    started = time.perf_counter()
+    if connection.transport not in SUPPORTED_TRANSPORTS:
+        report.update(status="skipped", error=f"지원하지 않는 전송 방식 '{connection.transport}'")
+        return None, report
+    try:
+        await connection.start(timeout)
+    except asyncio.TimeoutError:
+        report.update(status="timeout", error=f"{timeout:g}초 안에 연결되지 않았습니다")
+        connection = None
+    except Exception as e:
+        report.update(status="failed", error=str(e) or type(e).__name__)
+        connection = None
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return connection, report
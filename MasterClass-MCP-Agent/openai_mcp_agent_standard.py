@@ -7,17 +7,25 @@ OpenAI Agents SDK with MCP Extension
 import asyncio
 import os
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
-from contextlib import AsyncExitStack
 
 from openai import AsyncOpenAI
-from openai.types.chat import ChatCompletionMessageParam, ChatCompletionMessageToolCall
+from openai.types.chat import ChatCompletionMessageToolCall
 
-from mcp.client.stdio import stdio_client
-from mcp import StdioServerParameters, ClientSession
-from mcp.types import Tool as MCPTool, TextContent
+from mcp import ClientSession
+from mcp.types import ServerNotification, TextContent, ToolListChangedNotification
 
+from conversations import Conversation, ConversationManager
+from mcp_connections import ServerConnection, connect_server
+from tool_cache import ToolResultCache, parse_ttls
+from tool_catalog import ToolCatalog
+
+
+def setting(config: Dict[str, Any], key: str, env_name: str, default: str) -> Any:
+    """설정 값을 config, 환경 변수, 기본값 순서로 찾습니다. 0처럼 거짓으로 평가되는 값도 그대로 사용합니다."""
+    value = config.get(key)
+    return os.getenv(env_name, default) if value is None else value
 
 class OpenaiMcpAgentStandard:
     """
@@ -30,9 +38,29 @@ class OpenaiMcpAgentStandard:
             api_key=config["api_key"],
         )
         self.model_name = config["model_name"]
-        self.exit_stack = AsyncExitStack()
+        self.connections: Dict[str, ServerConnection] = {}
         self.sessions: Dict[str, ClientSession] = {}
-        self.messages: List[ChatCompletionMessageParam] = []
+        # 서버별 시작 결과와 소요 시간 (connect_to_servers 호출 시 채워짐)
+        self.startup_report: List[Dict[str, Any]] = []
+        self.connect_timeout = float(setting(config, "connect_timeout", "MCP_CONNECT_TIMEOUT_SECONDS", "20"))
+        # 도구 목록과 OpenAI 형식 스키마는 연결 시 한 번 만들어 재사용합니다.
+        self.tool_catalog = ToolCatalog()
+        # 한 턴의 여러 도구 호출은 동시에 실행하되, 동시 실행 수와 호출별 시간을 제한합니다.
+        self.tool_concurrency = int(setting(config, "tool_concurrency", "MCP_TOOL_CONCURRENCY", "4"))
+        self.tool_timeout = float(setting(config, "tool_timeout", "MCP_TOOL_TIMEOUT_SECONDS", "30"))
+        # 멱등 도구의 결과 캐시. 도구별로 켭니다. (예: MCP_TOOL_CACHE_TTLS="get_forecast=300,get_weather=60")
+        cache_ttls = config.get("tool_cache_ttls")
+        if cache_ttls is None:
+            cache_ttls = parse_ttls(os.getenv("MCP_TOOL_CACHE_TTLS", ""))
+        self.tool_cache = ToolResultCache(cache_ttls)
+        # 클라이언트별 대화 기록. 세션 수, 유휴 시간, 세션별 기록 크기를 제한합니다.
+        self.conversations = ConversationManager(
+            max_sessions=int(setting(config, "max_sessions", "AGENT_MAX_SESSIONS", "500")),
+            idle_timeout=float(setting(config, "session_idle_timeout", "AGENT_SESSION_IDLE_SECONDS", "1800")),
+            max_messages=int(setting(config, "session_max_messages", "AGENT_SESSION_MAX_MESSAGES", "200")),
+            max_chars=int(setting(config, "session_max_chars", "AGENT_SESSION_MAX_CHARS", "200000")),
+            token_budget=int(setting(config, "history_token_budget", "AGENT_HISTORY_TOKEN_BUDGET", "8000")),
+        )
 
     async def connect_to_servers(self, config_path: str = "mcp_servers.json"):
         """mcp_servers.json 설정 파일을 읽어 모든 MCP 서버에 연결합니다."""
@@ -43,80 +71,165 @@ class OpenaiMcpAgentStandard:
             print(f"❌ '{config_path}' 파일 처리 오류: {e}")
             return
 
-        for server_name, config in server_configs.items():
-            if config.get("transport") == "stdio":
-                print(f"'{server_name}' 서버에 연결을 시도합니다... (stdio)")
-                server_params = StdioServerParameters(
-                    command=config["command"],
-                    args=config.get("args", []),
-                    env=config.get("env")
-                )
-                try:
-                    stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
-                    _, write = stdio_transport
-                    session = await self.exit_stack.enter_async_context(ClientSession(stdio_transport[0], write))
-                    await session.initialize()
-                    self.sessions[server_name] = session
-                    print(f"✅ '{server_name}' 서버에 성공적으로 연결되었습니다.")
-                except Exception as e:
-                    print(f"❌ '{server_name}' 서버 연결 실패: {e}")
-            # TODO: Add support for other transports like 'sse' if needed
-
-    async def run_query(self, query: str) -> str:
+        # 모든 서버를 동시에 시작합니다. 실패하거나 시간을 넘긴 서버는 건너뜁니다.
+        print(f"MCP 서버 {len(server_configs)}개에 동시에 연결을 시도합니다... (서버별 제한 {self.connect_timeout:g}초)")
+        results = await asyncio.gather(*(
+            connect_server(server_name, config, self.connect_timeout, self._make_message_handler(server_name))
+            for server_name, config in server_configs.items()
+        ))
+        self.startup_report = []
+        for connection, report in results:
+            self.startup_report.append(report)
+            if connection is None:
+                print(f"❌ '{report['server']}' 서버 연결 실패 ({report['status']}, {report['seconds']}초): {report['error']}")
+                continue
+            self.connections[connection.name] = connection
+            self.sessions[connection.name] = connection.session
+            self.tool_catalog.invalidate(connection.name)
+            print(f"✅ '{connection.name}' 서버에 성공적으로 연결되었습니다. ({report['transport']}, {report['seconds']}초)")
+
+        # 연결된 모든 서버의 도구 목록을 한 번에 가져와 캐시합니다.
+        await self.tool_catalog.ensure_fresh(self.sessions)
+
+    def _make_message_handler(self, server_name: str):
+        """서버 알림을 처리하는 핸들러. 도구 목록이 바뀌면 카탈로그를 무효화합니다."""
+        async def handle(message) -> None:
+            if isinstance(message, ServerNotification) and isinstance(message.root, ToolListChangedNotification):
+                print(f"🔄 '{server_name}' 서버의 도구 목록이 변경되었습니다.")
+                self.tool_catalog.invalidate(server_name)
+                self.tool_cache.clear()
+        return handle
+
+    async def run_query(self, query: str, conversation: Optional[Conversation] = None) -> str:
+        """`conversation`의 대화 기록에 이어서 질의를 처리합니다. 생략하면 기본 대화를 사용합니다."""
         if not self.sessions:
             raise RuntimeError("연결된 MCP 서버가 없습니다. 먼저 connect_to_servers()를 호출하세요.")
 
-        self.messages.append({"role": "user", "content": query})
-
-        # 모든 서버에서 사용 가능한 도구 목록 가져오기
-        all_tools = []
-        for session in self.sessions.values():
+        conversation = conversation or self.conversations.get("default")
+        async with conversation.lock:
             try:
-                list_tools_response = await session.list_tools()
-                all_tools.extend(list_tools_response.tools)
-            except Exception as e:
-                print(f"⚠️ 도구 목록 가져오기 오류: {e}")
-        
-        tools_for_openai = [self._format_tool_for_openai(tool) for tool in all_tools]
+                return await self._run_turn(conversation, query)
+            finally:
+                self.conversations.trim(conversation)
+
+    async def _run_turn(self, conversation: Conversation, query: str) -> str:
+        conversation.append({"role": "user", "content": query})
+
+        # 캐시된 도구 목록 사용 (변경 알림을 받은 서버만 다시 가져옴)
+        await self.tool_catalog.ensure_fresh(self.sessions)
+        tools_for_openai = self.tool_catalog.openai_tools
 
         while True:
             response = await self.client.chat.completions.create(
                 model=self.model_name,
-                messages=self.messages,
+                # 토큰 예산 안의 최근 턴만 보냅니다. (전체 기록은 conversation에 남아 있음)
+                messages=self.conversations.window(conversation),
                 tools=tools_for_openai,
                 tool_choice="auto",
             )
             response_message = response.choices[0].message
 
+            # 기록 크기를 셀 수 있도록 응답 객체 대신 dict로 저장합니다.
+            conversation.append(response_message.model_dump(exclude_none=True))
             if not response_message.tool_calls:
-                self.messages.append(response_message)
                 return response_message.content or "죄송합니다, 답변을 생성할 수 없습니다."
 
-            self.messages.append(response_message)
-            
-            for tool_call in response_message.tool_calls:
-                tool_result = await self._execute_tool_call(tool_call, all_tools)
-                self.messages.append({
-                    "tool_call_id": tool_call.id,
-                    "role": "tool",
-                    "name": tool_call.function.name,
-                    "content": tool_result,
-                })
-
-    async def _execute_tool_call(self, tool_call: ChatCompletionMessageToolCall, available_tools: List[MCPTool]) -> str:
+            await self._run_tool_calls(conversation, response_message.tool_calls)
+
+    async def run_query_stream(
+        self, query: str, conversation: Optional[Conversation] = None
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        run_query의 스트리밍 버전. 모델이 생성하는 텍스트 조각을 도착하는 대로 (라운드 번호, 조각)으로 내보냅니다.
+        도구 호출은 스트리밍된 조각(delta)을 모아 완성한 뒤 실행하고, 그 결과로 다음 라운드를 이어서 스트리밍합니다.
+        run_query의 응답에 해당하는 것은 마지막 라운드의 조각들뿐입니다.
+        """
+        if not self.sessions:
+            raise RuntimeError("연결된 MCP 서버가 없습니다. 먼저 connect_to_servers()를 호출하세요.")
+
+        conversation = conversation or self.conversations.get("default")
+        async with conversation.lock:
+            try:
+                conversation.append({"role": "user", "content": query})
+                await self.tool_catalog.ensure_fresh(self.sessions)
+                tools_for_openai = self.tool_catalog.openai_tools
+
+                round_index = 0
+                while True:
+                    stream = await self.client.chat.completions.create(
+                        model=self.model_name,
+                        messages=self.conversations.window(conversation),
+                        tools=tools_for_openai,
+                        tool_choice="auto",
+                        stream=True,
+                    )
+                    content_parts: List[str] = []
+                    # 도구 호출은 index별로 id/이름/인자 조각이 나뉘어 도착합니다.
+                    partial_calls: Dict[int, Dict[str, Any]] = {}
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta
+                        if delta.content:
+                            content_parts.append(delta.content)
+                            yield round_index, delta.content
+                        for call_delta in delta.tool_calls or []:
+                            call = partial_calls.setdefault(call_delta.index, {
+                                "id": "", "type": "function", "function": {"name": "", "arguments": ""},
+                            })
+                            if call_delta.id:
+                                call["id"] = call_delta.id
+                            if call_delta.function:
+                                call["function"]["name"] += call_delta.function.name or ""
+                                call["function"]["arguments"] += call_delta.function.arguments or ""
+
+                    message: Dict[str, Any] = {"role": "assistant", "content": "".join(content_parts) or None}
+                    if partial_calls:
+                        message["tool_calls"] = [partial_calls[index] for index in sorted(partial_calls)]
+                    conversation.append(message)
+                    if not partial_calls:
+                        if not content_parts:
+                            yield round_index, "죄송합니다, 답변을 생성할 수 없습니다."
+                        return
+
+                    tool_calls = [ChatCompletionMessageToolCall.model_validate(call) for call in message["tool_calls"]]
+                    await self._run_tool_calls(conversation, tool_calls)
+                    round_index += 1
+            finally:
+                self.conversations.trim(conversation)
+
+    async def _run_tool_calls(self, conversation: Conversation, tool_calls: List[ChatCompletionMessageToolCall]) -> None:
+        """도구 호출들을 실행하고 결과를 호출 순서대로 대화에 추가합니다."""
+        tool_results = await self._execute_tool_calls(tool_calls)
+        for tool_call, tool_result in zip(tool_calls, tool_results):
+            conversation.append({
+                "tool_call_id": tool_call.id,
+                "role": "tool",
+                "name": tool_call.function.name,
+                "content": tool_result,
+            })
+
+    async def _execute_tool_calls(self, tool_calls: List[ChatCompletionMessageToolCall]) -> List[str]:
+        """한 턴의 도구 호출들을 동시에 실행합니다. 결과는 원래 호출 순서대로 반환됩니다."""
+        semaphore = asyncio.Semaphore(self.tool_concurrency)
+
+        async def run_one(tool_call: ChatCompletionMessageToolCall) -> str:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(self._execute_tool_call(tool_call), timeout=self.tool_timeout)
+                except asyncio.TimeoutError:
+                    error_msg = f"오류: 도구 '{tool_call.function.name}' 실행 시간이 {self.tool_timeout:g}초를 초과했습니다."
+                    print(error_msg)
+                    return error_msg
+
+        return await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls))
+
+    async def _execute_tool_call(self, tool_call: ChatCompletionMessageToolCall) -> str:
         tool_name = tool_call.function.name
         
-        # 도구를 제공하는 올바른 세션 찾기
-        target_session = None
-        for session in self.sessions.values():
-            try:
-                # 간단한 방법: 세션이 도구 이름을 아는지 확인 (실제로는 list_tools 결과를 캐시해야 효율적)
-                server_tools_response = await session.list_tools()
-                if any(t.name == tool_name for t in server_tools_response.tools):
-                    target_session = session
-                    break
-            except Exception:
-                continue # 오류가 발생한 세션은 건너뜀
+        # 도구 이름 -> 서버 색인으로 세션 찾기
+        server_name = self.tool_catalog.owner(tool_name)
+        target_session = self.sessions.get(server_name) if server_name else None
         
         if not target_session:
             return f"오류: 도구 '{tool_name}'을(를) 제공하는 서버를 찾을 수 없습니다."
@@ -125,7 +238,10 @@ class OpenaiMcpAgentStandard:
             tool_args = json.loads(tool_call.function.arguments)
             print(f"도구 호출: {tool_name}, 인자: {tool_args}")
 
-            call_result = await target_session.call_tool(tool_name, tool_args)
+            # 캐시가 켜진 도구는 같은 인자의 결과를 모든 대화가 공유합니다.
+            call_result = await self.tool_cache.call(
+                tool_name, tool_args, lambda: target_session.call_tool(tool_name, tool_args)
+            )
             # 서버로부터 받은 원본 결과가 무엇인지 확인하기 위한 디버깅 로그 추가
             print(f"DEBUG: 서버로부터 받은 원본 결과: {call_result!r}")
             
@@ -139,22 +255,14 @@ class OpenaiMcpAgentStandard:
             print(error_msg)
             return error_msg
 
-    def _format_tool_for_openai(self, tool: MCPTool) -> Dict[str, Any]:
-        """MCP Tool 객체를 OpenAI API 형식으로 변환합니다."""
-        return {
-            "type": "function",
-            "function": {
-                "name": tool.name,
-                "description": tool.description,
-                "parameters": tool.inputSchema,
-            },
-        }
-        
     async def close(self):
         """활성화된 모든 리소스를 정리합니다."""
         print("모든 MCP 서버 연결을 종료합니다.")
-        await self.exit_stack.aclose()
+        await asyncio.gather(*(connection.close() for connection in self.connections.values()))
+        self.connections.clear()
         self.sessions.clear()
+        self.tool_catalog = ToolCatalog()
+        self.tool_cache.clear()
 
 # 이 파일이 직접 실행될 때를 위한 간단한 테스트 로직 (주로 디버깅용)
 async def main():
@@ -8,6 +8,13 @@ class AIAgentInterface {
         this.reconnectAttempts = 0;
         this.maxReconnectAttempts = 5;
         this.reconnectDelay = 1000;
+        // 서버가 발급한 대화 세션 ID (재연결 시 같은 대화를 이어가기 위해 보관)
+        this.sessionId = sessionStorage.getItem('agentSessionId');
+        // 스트리밍 중인 AI 응답 (response_chunk를 모아 그리는 메시지)
+        this.streamingMessage = null;
+        this.streamingText = '';
+        this.streamingRound = 0;
+        this.renderScheduled = false;
         
         this.init();
     }
@@ -21,7 +28,8 @@ class AIAgentInterface {
     // WebSocket 연결 설정
     connectWebSocket() {
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-        const wsUrl = `${protocol}//${window.location.host}/ws`;
+        const query = this.sessionId ? `?session_id=${encodeURIComponent(this.sessionId)}` : '';
+        const wsUrl = `${protocol}//${window.location.host}/ws${query}`;
         
         try {
             this.websocket = new WebSocket(wsUrl);
@@ -76,17 +84,34 @@ class AIAgentInterface {
             const data = JSON.parse(event.data);
             
             switch (data.type) {
+                case 'connection':
+                    if (data.session_id) {
+                        this.sessionId = data.session_id;
+                        sessionStorage.setItem('agentSessionId', data.session_id);
+                    }
+                    break;
                 case 'system':
                     this.addMessage('system', data.message, data.timestamp);
                     break;
+                case 'response_chunk':
+                    this.appendResponseChunk(data.message, data.round || 0);
+                    break;
                 case 'response':
-                    this.addMessage('ai', data.message, data.timestamp);
+                    if (this.streamingMessage) {
+                        // 스트리밍된 메시지를 완성된 응답으로 마무리
+                        this.streamingText = data.message;
+                        this.renderStreamingMessage();
+                        this.streamingMessage = null;
+                    } else {
+                        this.addMessage('ai', data.message, data.timestamp);
+                    }
                     this.hideTypingIndicator();
                     break;
                 case 'command_response':
                     this.addMessage('ai', data.message, data.timestamp);
                     break;
                 case 'error':
+                    this.streamingMessage = null;
                     this.addMessage('error', data.message, data.timestamp);
                     this.hideTypingIndicator();
                     break;
@@ -251,6 +276,40 @@ class AIAgentInterface {
         
         // 스크롤을 맨 아래로
         chatMessages.scrollTop = chatMessages.scrollHeight;
+        return messageDiv;
+    }
+    
+    // 스트리밍 응답 조각 추가 (화면 갱신은 프레임당 한 번으로 모음)
+    // 도구 호출 뒤 새 라운드가 시작되면 앞 라운드의 중간 안내 대신 새 응답을 그립니다.
+    appendResponseChunk(chunk, round) {
+        if (!this.streamingMessage) {
+            this.hideTypingIndicator();
+            this.streamingText = '';
+            this.streamingRound = round;
+            this.streamingMessage = this.addMessage('ai', '');
+        }
+        if (round !== this.streamingRound) {
+            this.streamingRound = round;
+            this.streamingText = '';
+        }
+        this.streamingText += chunk;
+        if (!this.renderScheduled) {
+            this.renderScheduled = true;
+            requestAnimationFrame(() => {
+                this.renderScheduled = false;
+                this.renderStreamingMessage();
+            });
+        }
+    }
+    
+    // 스트리밍 중인 메시지 다시 그리기
+    renderStreamingMessage() {
+        if (!this.streamingMessage) {
+            return;
+        }
+        const chatMessages = document.getElementById('chatMessages');
+        this.streamingMessage.querySelector('.message-content').innerHTML = this.formatMessage(this.streamingText);
+        chatMessages.scrollTop = chatMessages.scrollHeight;
     }
     
     // 메시지 포맷팅 (링크, 코드 블록 등)
@@ -0,0 +1,137 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+from openai_mcp_agent import OpenAIMCPAgent  # noqa: E402
+from openai_mcp_agent_standard import OpenaiMcpAgentStandard  # noqa: E402
+
+CONFIG = {
+    "api_key": "test",
+    "azure_endpoint": "https://example.invalid",
+    "api_version": "2024-06-01",
+    "model_name": "test-model",
+    "tool_concurrency": 2,
+    "tool_timeout": 0.2,
+    "tool_cache_ttls": {},
+}
+
+
+@pytest.fixture(params=[OpenAIMCPAgent, OpenaiMcpAgentStandard])
+def agent(request):
+    return request.param(dict(CONFIG))
+
+
+def tool_call(name: str, delay: float):
+    return SimpleNamespace(id=f"call_{name}", function=SimpleNamespace(name=name, arguments=json.dumps({"delay": delay})))
+
+
+def stub_tool_calls(agent):
+    """_execute_tool_call을 인자의 delay만큼 기다리는 함수로 바꾸고, 동시 실행 수를 기록합니다."""
+    stats = {"running": 0, "peak": 0}
+
+    async def execute(call):
+        stats["running"] += 1
+        stats["peak"] = max(stats["peak"], stats["running"])
+        try:
+            await asyncio.sleep(json.loads(call.function.arguments)["delay"])
+            return f"result:{call.function.name}"
+        finally:
+            stats["running"] -= 1
+
+    agent._execute_tool_call = execute
+    return stats
+
+
+@pytest.mark.asyncio
+async def test_tool_results_keep_call_order(agent):
+    stub_tool_calls(agent)
+    calls = [tool_call("slow", 0.05), tool_call("fast", 0), tool_call("medium", 0.02)]
+
+    results = await agent._execute_tool_calls(calls)
+
+    assert results == ["result:slow", "result:fast", "result:medium"]
+
+
+@pytest.mark.asyncio
+async def test_tool_concurrency_is_capped(agent):
+    stats = stub_tool_calls(agent)
+
+    await agent._execute_tool_calls([tool_call(f"tool{i}", 0.02) for i in range(6)])
+
+    assert stats["peak"] == agent.tool_concurrency == 2
+
+
+@pytest.mark.asyncio
+async def test_timed_out_tool_call_becomes_error_message(agent):
+    stub_tool_calls(agent)
+
+    results = await agent._execute_tool_calls([tool_call("hung", 5), tool_call("quick", 0)])
+
+    assert results[0].startswith("오류: 도구 'hung' 실행 시간이")
+    assert results[1] == "result:quick"
+
+
+def chunk(content=None, tool_calls=None):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=tool_calls))])
+
+
+def call_delta(index, id=None, name=None, arguments=None):
+    return SimpleNamespace(index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+class FakeCompletions:
+    """라운드마다 미리 정해 둔 조각들을 스트리밍하는 chat.completions 대역."""
+
+    def __init__(self, *rounds):
+        self.rounds = list(rounds)
+
+    async def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        chunks = self.rounds.pop(0)
+
+        async def stream():
+            for item in chunks:
+                yield item
+
+        return stream()
+
+
+@pytest.mark.asyncio
+async def test_stream_assembles_tool_call_deltas_by_round(agent):
+    agent.sessions = {"weather": object()}
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(
+        [
+            chunk(content="확인해 "),
+            chunk(content="볼게요."),
+            chunk(tool_calls=[call_delta(0, id="call_a", name="get_", arguments='{"ci')]),
+            chunk(tool_calls=[call_delta(1, id="call_b", name="get_forecast", arguments='{"city": "Busan"}')]),
+            chunk(tool_calls=[call_delta(0, name="weather", arguments='ty": "Seoul"}')]),
+            SimpleNamespace(choices=[]),
+        ],
+        [chunk(content="서울은 "), chunk(content="맑습니다.")],
+    )))
+    executed = []
+
+    async def execute_tool_calls(tool_calls):
+        executed.extend(tool_calls)
+        return [f"result:{call.id}" for call in tool_calls]
+
+    agent._execute_tool_calls = execute_tool_calls
+    conversation = agent.conversations.get("test")
+
+    frames = [frame async for frame in agent.run_query_stream("날씨 알려줘", conversation)]
+
+    assert frames == [(0, "확인해 "), (0, "볼게요."), (1, "서울은 "), (1, "맑습니다.")]
+    assert [(call.id, call.function.name, json.loads(call.function.arguments)) for call in executed] == [
+        ("call_a", "get_weather", {"city": "Seoul"}),
+        ("call_b", "get_forecast", {"city": "Busan"}),
+    ]
+    messages = conversation.messages
+    assert [message["role"] for message in messages] == ["user", "assistant", "tool", "tool", "assistant"]
+    assert messages[1]["content"] == "확인해 볼게요."
+    assert [message["tool_call_id"] for message in messages[2:4]] == ["call_a", "call_b"]
+    assert messages[4]["content"] == "서울은 맑습니다."
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 에이전트 모듈은 패키지가 아니라 스크립트 디렉터리의 모듈이므로 경로에 추가합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,103 @@
+import time
+
+from conversations import ConversationManager
+
+
+def add_turn(conversation, question: str, answer: str = "답변") -> None:
+    """도구 호출이 포함된 한 턴(사용자 -> 도구 호출 -> 도구 결과 -> 답변)을 추가합니다."""
+    call_id = f"call_{question}"
+    conversation.append({"role": "user", "content": question})
+    conversation.append({
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [{"id": call_id, "type": "function", "function": {"name": "get_forecast", "arguments": '{"city":"Seoul"}'}}],
+    })
+    conversation.append({"role": "tool", "tool_call_id": call_id, "name": "get_forecast", "content": "맑음"})
+    conversation.append({"role": "assistant", "content": answer})
+
+
+def assert_tool_pairs_intact(messages) -> None:
+    """모든 도구 결과 앞에 그 호출이, 모든 도구 호출 뒤에 그 결과가 있는지 확인합니다."""
+    called = {call["id"] for m in messages for call in m.get("tool_calls") or []}
+    answered = {m["tool_call_id"] for m in messages if m.get("role") == "tool"}
+    assert called == answered
+
+
+def test_lru_session_is_evicted_when_full():
+    manager = ConversationManager(max_sessions=2)
+    manager.get("a")
+    manager.get("b")
+    manager.get("a")  # a를 최근 사용으로 표시
+    manager.get("c")
+
+    assert sorted(manager._conversations) == ["a", "c"]
+    assert manager.evicted == 1
+
+
+def test_idle_sessions_are_evicted(monkeypatch):
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    manager = ConversationManager(idle_timeout=60)
+    manager.get("old")
+    monkeypatch.setattr(time, "monotonic", lambda: now + 50)
+    manager.get("recent")
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 70)
+    assert manager.evict_idle() == 1
+    assert list(manager._conversations) == ["recent"]
+
+
+def test_trim_drops_whole_turns_and_keeps_system_prompt():
+    """상한을 넘으면 오래된 턴을 통째로 버리고, system 메시지와 도구 호출/결과 쌍은 유지하는지 테스트합니다."""
+    manager = ConversationManager(max_messages=9)
+    conversation = manager.get("a")
+    conversation.append({"role": "system", "content": "날씨 도우미"})
+    for i in range(4):
+        add_turn(conversation, f"q{i}")
+        manager.trim(conversation)
+
+    messages = conversation.messages
+    assert messages[0] == {"role": "system", "content": "날씨 도우미"}
+    assert [m["content"] for m in messages if m["role"] == "user"] == ["q2", "q3"]
+    assert_tool_pairs_intact(messages)
+    assert len(conversation.token_counts) == len(messages)
+
+
+def test_window_keeps_system_prompt_and_latest_turns_within_budget():
+    """토큰 예산 안에서 system 메시지와 최근 턴만, 도구 호출/결과 쌍을 깨지 않고 보내는지 테스트합니다."""
+    manager = ConversationManager()
+    conversation = manager.get("a")
+    conversation.append({"role": "system", "content": "날씨 도우미"})
+    for i in range(5):
+        add_turn(conversation, f"q{i}")
+    turn_tokens = sum(conversation.token_counts[1:5])
+    manager.token_budget = conversation.token_counts[0] + 2 * turn_tokens
+
+    window = manager.window(conversation)
+
+    assert window[0]["role"] == "system"
+    assert [m["content"] for m in window if m["role"] == "user"] == ["q3", "q4"]
+    assert_tool_pairs_intact(window)
+    assert len(conversation.messages) == 21  # 전체 기록은 그대로
+    assert manager.windowed == 1
+
+
+def test_window_always_includes_latest_turn():
+    manager = ConversationManager(token_budget=1)
+    conversation = manager.get("a")
+    add_turn(conversation, "q0")
+    add_turn(conversation, "q1")
+
+    window = manager.window(conversation)
+
+    assert [m["content"] for m in window if m["role"] == "user"] == ["q1"]
+    assert_tool_pairs_intact(window)
+
+
+def test_zero_budget_sends_full_history():
+    manager = ConversationManager(token_budget=0)
+    conversation = manager.get("a")
+    for i in range(3):
+        add_turn(conversation, f"q{i}")
+
+    assert manager.window(conversation) is conversation.messages
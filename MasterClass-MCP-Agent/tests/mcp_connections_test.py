@@ -0,0 +1,107 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+import mcp_connections
+from mcp_connections import connect_server
+
+
+class FakeSession:
+    """ClientSession 대신 쓰는 세션. 열고 닫은 태스크를 기록합니다."""
+
+    def __init__(self, read, write, message_handler=None):
+        self.entered_in = None
+        self.exited_in = None
+
+    async def __aenter__(self):
+        self.entered_in = asyncio.current_task()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.exited_in = asyncio.current_task()
+
+    async def initialize(self):
+        pass
+
+
+@pytest.fixture
+def fake_transports(monkeypatch):
+    """설정의 "behavior"에 따라 연결되거나, 멈추거나, 실패하는 전송으로 바꿉니다."""
+    closed = []
+
+    @asynccontextmanager
+    async def transport(config):
+        try:
+            if config["behavior"] == "hang":
+                await asyncio.Event().wait()
+            if config["behavior"] == "fail":
+                raise ConnectionError("connection refused")
+            yield "read", "write"
+        finally:
+            closed.append(config["name"])
+
+    async def open_transport(stack, config):
+        return await stack.enter_async_context(transport(config))
+
+    monkeypatch.setattr(mcp_connections, "open_transport", open_transport)
+    monkeypatch.setattr(mcp_connections, "ClientSession", FakeSession)
+    return closed
+
+
+def config(name: str, behavior: str):
+    return {"name": name, "behavior": behavior, "transport": "stdio"}
+
+
+@pytest.mark.asyncio
+async def test_hung_server_times_out_without_blocking_others(fake_transports):
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        connect_server("slow", config("slow", "hang"), timeout=0.2),
+        connect_server("weather", config("weather", "ok"), timeout=0.2),
+    )
+    elapsed = time.perf_counter() - started
+
+    (slow, slow_report), (weather, weather_report) = results
+    assert slow is None and slow_report["status"] == "timeout"
+    assert weather is not None and weather_report["status"] == "connected"
+    assert weather_report["seconds"] < 0.2
+    assert elapsed < 1.0
+    # 시간을 넘긴 연결의 전송도 정리되어야 합니다.
+    assert fake_transports == ["slow"]
+    await weather.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_server_is_reported_as_failed(fake_transports):
+    connection, report = await connect_server("broken", config("broken", "fail"), timeout=1.0)
+
+    assert connection is None
+    assert report["status"] == "failed"
+    assert report["error"] == "connection refused"
+    assert fake_transports == ["broken"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_transport_is_skipped(fake_transports):
+    connection, report = await connect_server("odd", {"transport": "websocket"}, timeout=1.0)
+
+    assert connection is None
+    assert report["status"] == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_close_tears_down_in_connection_task(fake_transports):
+    connection, _ = await connect_server("weather", config("weather", "ok"), timeout=1.0)
+    session = connection.session
+    task = connection._task
+
+    # 연결을 연 태스크와 다른 태스크에서 닫아도 정리는 연결 전용 태스크에서 일어납니다.
+    await asyncio.create_task(connection.close())
+
+    assert session.entered_in is task
+    assert session.exited_in is task
+    assert task.get_name() == "mcp-server-weather"
+    assert connection.session is None
+    assert fake_transports == ["weather"]
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+from mcp.types import CallToolResult, TextContent
+
+from tool_cache import ToolResultCache, canonical_arguments, parse_ttls
+
+
+def make_fetch(calls: list, text: str = "맑음", is_error: bool = False, delay: float = 0.0):
+    async def fetch() -> CallToolResult:
+        calls.append(text)
+        await asyncio.sleep(delay)
+        return CallToolResult(content=[TextContent(type="text", text=text)], isError=is_error)
+    return fetch
+
+
+def test_parse_ttls_and_canonical_arguments():
+    assert parse_ttls("get_forecast=300, get_weather=60,,bad") == {"get_forecast": 300.0, "get_weather": 60.0}
+    assert canonical_arguments({"days": 3, "city": "Seoul"}) == canonical_arguments({"city": "Seoul", "days": 3})
+
+
+@pytest.mark.asyncio
+async def test_only_opted_in_tools_are_cached():
+    cache = ToolResultCache({"get_forecast": 60})
+    calls = []
+    for _ in range(2):
+        await cache.call("get_forecast", {"city": "Seoul", "days": 3}, make_fetch(calls))
+        await cache.call("get_time", {}, make_fetch(calls))
+
+    assert calls == ["맑음", "맑음", "맑음"]
+    assert cache.stats()["tools"] == {"get_forecast": {"hits": 1, "misses": 1, "coalesced": 0, "hit_rate": 0.5}}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_fetch():
+    cache = ToolResultCache({"get_forecast": 60})
+    calls = []
+
+    results = await asyncio.gather(*(
+        cache.call("get_forecast", arguments, make_fetch(calls, delay=0.01))
+        for arguments in ({"city": "Seoul", "days": 3}, {"days": 3, "city": "Seoul"}, {"city": "Seoul", "days": 3})
+    ))
+
+    assert len(calls) == 1
+    assert results[0] is results[1] is results[2]
+    assert cache.stats()["tools"]["get_forecast"]["coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_timed_out_waiter_does_not_cancel_shared_call():
+    cache = ToolResultCache({"get_forecast": 60})
+    calls = []
+    fetch = make_fetch(calls, delay=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(cache.call("get_forecast", {"city": "Seoul"}, fetch), timeout=0.01)
+    result = await cache.call("get_forecast", {"city": "Seoul"}, fetch)
+
+    assert len(calls) == 1
+    assert result.content[0].text == "맑음"
+
+
+@pytest.mark.asyncio
+async def test_error_results_are_not_cached():
+    cache = ToolResultCache({"get_forecast": 60})
+    calls = []
+    for _ in range(2):
+        await cache.call("get_forecast", {"city": "Nowhere"}, make_fetch(calls, is_error=True))
+
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(monkeypatch):
+    cache = ToolResultCache({"get_forecast": 60})
+    calls = []
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    await cache.call("get_forecast", {"city": "Seoul"}, make_fetch(calls))
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    await cache.call("get_forecast", {"city": "Seoul"}, make_fetch(calls))
+
+    assert len(calls) == 2
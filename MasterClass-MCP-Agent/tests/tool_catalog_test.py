@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from mcp.types import Tool
+
+from tool_catalog import ToolCatalog
+
+
+class FakeSession:
+    def __init__(self, *names: str, delay: float = 0):
+        self.names = list(names)
+        self.delay = delay
+        self.list_calls = 0
+
+    async def list_tools(self):
+        self.list_calls += 1
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(tools=[Tool(name=name, description=name, inputSchema={"type": "object"}) for name in self.names])
+
+
+@pytest.mark.asyncio
+async def test_tools_fetched_once_and_indexed_by_server():
+    catalog = ToolCatalog()
+    sessions = {"weather": FakeSession("get_forecast"), "example": FakeSession("add", "get_forecast")}
+    for name in sessions:
+        catalog.invalidate(name)
+
+    await catalog.ensure_fresh(sessions)
+    await catalog.ensure_fresh(sessions)
+
+    assert [session.list_calls for session in sessions.values()] == [1, 1]
+    assert catalog.owner("add") == "example"
+    # 이름이 겹치면 설정에서 앞에 있는 서버를 사용합니다.
+    assert catalog.owner("get_forecast") == "weather"
+    assert [tool["function"]["name"] for tool in catalog.openai_tools] == ["get_forecast", "add"]
+
+
+@pytest.mark.asyncio
+async def test_order_follows_config_not_refresh_completion():
+    catalog = ToolCatalog()
+    sessions = {"weather": FakeSession("get_forecast", delay=0.05), "example": FakeSession("add", "get_forecast")}
+    for name in sessions:
+        catalog.invalidate(name)
+
+    await catalog.ensure_fresh(sessions)
+
+    assert catalog.owner("get_forecast") == "weather"
+    assert [tool["function"]["name"] for tool in catalog.openai_tools] == ["get_forecast", "add"]
+    assert [tool["server"] for tool in catalog.describe()] == ["weather", "example", "example"]
+
+
+@pytest.mark.asyncio
+async def test_list_changed_refetches_only_that_server():
+    catalog = ToolCatalog()
+    weather, example = FakeSession("get_forecast"), FakeSession("add")
+    sessions = {"weather": weather, "example": example}
+    for name in sessions:
+        catalog.invalidate(name)
+    await catalog.ensure_fresh(sessions)
+
+    example.names.append("multiply")
+    catalog.invalidate("example")
+    await catalog.ensure_fresh(sessions)
+
+    assert (weather.list_calls, example.list_calls) == (1, 2)
+    assert catalog.owner("multiply") == "example"
+
+
+@pytest.mark.asyncio
+async def test_disconnected_server_is_removed():
+    catalog = ToolCatalog()
+    catalog.invalidate("weather")
+    await catalog.ensure_fresh({"weather": FakeSession("get_forecast")})
+
+    catalog.invalidate("weather")
+    await catalog.ensure_fresh({})
+
+    assert catalog.owner("get_forecast") is None
+    assert catalog.openai_tools == []
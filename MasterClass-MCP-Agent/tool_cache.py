@@ -0,0 +1,99 @@
+"""
+MCP 도구 결과 캐시
+멱등(idempotent) 도구의 결과를 도구 이름과 정규화된 인자로 묶어 TTL 동안 모든 대화가 공유합니다.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from mcp.types import CallToolResult
+
+CacheKey = Tuple[str, str]
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """`"get_forecast=300,get_weather=60"` 형식의 설정을 {도구 이름: TTL 초}로 변환합니다."""
+    ttls: Dict[str, float] = {}
+    for item in spec.split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() and seconds.strip():
+            ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+def canonical_arguments(arguments: Dict[str, Any]) -> str:
+    """키 순서와 공백이 달라도 같은 인자는 같은 문자열이 되도록 정규화합니다."""
+    return json.dumps(arguments, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+class ToolResultCache:
+    """
+    도구별로 켜는(opt-in) 결과 캐시. `ttls`에 있는 도구만 캐시하며, 오류 결과는 저장하지 않습니다.
+    같은 키에 대한 동시 호출은 진행 중인 호출 하나의 결과를 함께 기다립니다. 대기자 하나가
+    취소되거나 시간 초과되어도 공유 호출은 취소되지 않습니다.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = 1024):
+        self.ttls = ttls or {}
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[float, CallToolResult]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        # 도구별 지표
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def enabled(self, tool_name: str) -> bool:
+        return self.ttls.get(tool_name, 0) > 0
+
+    async def call(self, tool_name: str, arguments: Dict[str, Any], fetch: Callable[[], Awaitable[CallToolResult]]) -> CallToolResult:
+        """캐시된 결과가 있으면 반환하고, 없으면 `fetch`를 (같은 키당 한 번만) 실행합니다."""
+        if not self.enabled(tool_name):
+            return await fetch()
+
+        stats = self._stats.setdefault(tool_name, {"hits": 0, "misses": 0, "coalesced": 0})
+        key = (tool_name, canonical_arguments(arguments))
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                stats["hits"] += 1
+                return result
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            stats["misses"] += 1
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: CacheKey, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if result.isError:
+            return
+        self._entries[key] = (time.monotonic() + self.ttls[key[0]], result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        tools = {}
+        for tool_name, counts in self._stats.items():
+            # 동시 호출에 합류한 요청도 업스트림 호출을 아꼈으므로 적중으로 봅니다.
+            total = counts["hits"] + counts["misses"] + counts["coalesced"]
+            saved = counts["hits"] + counts["coalesced"]
+            tools[tool_name] = {**counts, "hit_rate": round(saved / total, 4) if total else 0.0}
+        return {"ttls": self.ttls, "entries": len(self._entries), "in_flight": len(self._inflight), "tools": tools}
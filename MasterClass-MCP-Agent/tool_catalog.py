@@ -0,0 +1,105 @@
+"""
+MCP 도구 카탈로그
+연결된 모든 MCP 서버의 도구 목록과 OpenAI 형식 스키마를 캐시합니다.
+"""
+
+import asyncio
+from typing import Any, Dict, List
+
+from mcp import ClientSession
+from mcp.types import Tool as MCPTool
+
+
+def format_tool_for_openai(tool: MCPTool) -> Dict[str, Any]:
+    """MCP Tool 객체를 OpenAI API 형식으로 변환합니다."""
+    return {
+        "type": "function",
+        "function": {
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": tool.inputSchema,
+        },
+    }
+
+
+class ToolCatalog:
+    """
+    서버별 도구 목록을 한 번 가져와 캐시하고, 도구 이름 -> 서버 이름 색인을 유지합니다.
+    서버가 tools/list_changed 알림을 보내면 해당 서버만 무효화되고, 다음 사용 시 다시 가져옵니다.
+    도구 순서와 이름 중복 시의 우선순위는 설정(sessions)에 적힌 서버 순서를 따릅니다.
+    """
+
+    def __init__(self):
+        self._server_tools: Dict[str, List[MCPTool]] = {}
+        self._owners: Dict[str, str] = {}
+        self._openai_tools: List[Dict[str, Any]] = []
+        self._stale: set[str] = set()
+        self._server_order: List[str] = []
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, server_name: str, session: ClientSession) -> None:
+        """한 서버의 도구 목록을 다시 가져옵니다."""
+        response = await session.list_tools()
+        self._server_tools[server_name] = list(response.tools)
+        self._stale.discard(server_name)
+        self._rebuild()
+
+    def invalidate(self, server_name: str) -> None:
+        """서버의 도구 목록이 바뀌었음을 표시합니다 (tools/list_changed)."""
+        self._stale.add(server_name)
+
+    def remove(self, server_name: str) -> None:
+        self._server_tools.pop(server_name, None)
+        self._stale.discard(server_name)
+        self._rebuild()
+
+    async def ensure_fresh(self, sessions: Dict[str, ClientSession]) -> None:
+        """무효화된 서버의 도구 목록만 (동시에) 다시 가져옵니다."""
+        if not self._stale:
+            return
+        async with self._lock:
+            self._server_order = list(sessions)
+
+            async def refresh_one(server_name: str) -> None:
+                session = sessions.get(server_name)
+                if session is None:
+                    self.remove(server_name)
+                    return
+                try:
+                    await self.refresh(server_name, session)
+                except Exception as e:
+                    print(f"⚠️ '{server_name}' 도구 목록 갱신 오류: {e}")
+
+            await asyncio.gather(*(refresh_one(server_name) for server_name in list(self._stale)))
+
+    def _ordered_servers(self) -> List[str]:
+        """설정 순서대로 정렬한 서버 이름. 설정에 없는 서버는 뒤에 둡니다."""
+        rank = {name: index for index, name in enumerate(self._server_order)}
+        return sorted(self._server_tools, key=lambda name: rank.get(name, len(rank)))
+
+    def _rebuild(self) -> None:
+        self._owners = {}
+        self._openai_tools = []
+        for server_name in self._ordered_servers():
+            for tool in self._server_tools[server_name]:
+                if tool.name in self._owners:
+                    print(f"⚠️ 도구 이름 '{tool.name}'이(가) '{self._owners[tool.name]}'와 '{server_name}'에 중복되어 앞의 서버를 사용합니다.")
+                    continue
+                self._owners[tool.name] = server_name
+                self._openai_tools.append(format_tool_for_openai(tool))
+
+    @property
+    def openai_tools(self) -> List[Dict[str, Any]]:
+        return self._openai_tools
+
+    def owner(self, tool_name: str) -> str | None:
+        """도구를 제공하는 서버 이름을 반환합니다."""
+        return self._owners.get(tool_name)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """UI 표시용 도구 목록."""
+        return [
+            {"name": tool.name, "description": tool.description, "server": server_name}
+            for server_name in self._ordered_servers()
+            for tool in self._server_tools[server_name]
+        ]
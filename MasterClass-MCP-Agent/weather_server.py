@@ -4,6 +4,8 @@
 import os
 import json
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any
 
@@ -42,39 +44,92 @@ http_params = {
     "units": "metric"
 }
 
+# 모든 OpenWeatherMap 호출이 공유하는 HTTP 클라이언트 (main()에서 생성)
+http_client: httpx.AsyncClient | None = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """연결 풀과 keep-alive가 설정된 공유 HTTP 클라이언트를 반환합니다."""
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("WEATHER_HTTP_MAX_CONNECTIONS", "20")),
+                max_keepalive_connections=int(os.getenv("WEATHER_HTTP_MAX_KEEPALIVE", "10")),
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(10.0, connect=3.0),
+        )
+    return http_client
+
 # 캐시 설정
-cache_timeout = timedelta(minutes=15)
-last_cache_time = None
-cached_weather = None
+cache_timeout = timedelta(minutes=int(os.getenv("WEATHER_CACHE_TTL_MINUTES", "15")))
+CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "256"))
+
+class TTLCache:
+    """키별 TTL과 LRU 축출을 지원하는 인메모리 캐시."""
+
+    def __init__(self, ttl: timedelta, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """캐시된 값을 반환합니다. 없거나 만료된 경우 None을 반환합니다."""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl.total_seconds():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """값을 저장하고 필요하면 가장 오래 사용되지 않은 항목을 축출합니다."""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._entries)}
+
+# 도시별 OpenWeatherMap 현재 날씨 원본 응답 캐시
+weather_cache = TTLCache(ttl=cache_timeout, max_entries=CACHE_MAX_ENTRIES)
+
+async def fetch_current_weather_data(city: str) -> dict[str, Any]:
+    """도시의 현재 날씨 원본 응답을 가져오며 도시별 캐싱을 적용합니다."""
+    cached = weather_cache.get(city)
+    if cached is not None:
+        logger.info(f"{city}의 캐시된 날씨 정보를 사용합니다. (캐시 통계: {weather_cache.stats()})")
+        return cached
+
+    response = await get_http_client().get(
+        f"{API_BASE_URL}/weather",
+        params={"q": city, **http_params}
+    )
+    logger.info(f"OpenWeatherMap API 응답 코드: {response.status_code}")
+    response.raise_for_status()
+    data = response.json()
+
+    data["_fetched_at"] = datetime.now().isoformat()
+    weather_cache.set(city, data)
+    return data
 
 async def fetch_weather(city: str) -> dict[str, Any]:
     """지정된 도시의 현재 날씨 정보를 가져오며 캐싱을 적용합니다."""
-    global cached_weather, last_cache_time
-
-    now = datetime.now()
-    if (cached_weather is None or
-        last_cache_time is None or
-        now - last_cache_time > cache_timeout):
-
-        # 실제 API 호출
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_BASE_URL}/weather",
-                params={"q": city, **http_params}
-            )
-            response.raise_for_status()
-            data = response.json()
-
-        cached_weather = {
-            "temperature": data["main"]["temp"],
-            "conditions": data["weather"][0]["description"],
-            "humidity": data["main"]["humidity"],
-            "wind_speed": data["wind"]["speed"],
-            "timestamp": now.isoformat()
-        }
-        last_cache_time = now
-
-    return cached_weather
+    data = await fetch_current_weather_data(city)
+    return {
+        "temperature": data["main"]["temp"],
+        "conditions": data["weather"][0]["description"],
+        "humidity": data["main"]["humidity"],
+        "wind_speed": data["wind"]["speed"],
+        "timestamp": data["_fetched_at"]
+    }
 
 # MCP 서버 인스턴스 생성
 app = Server("weather-server")
@@ -145,15 +200,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
     logger.info(f"날씨 도구 호출 시작: city={city}")
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_BASE_URL}/weather",
-                params={"q": city, **http_params}
-            )
-            logger.info(f"OpenWeatherMap API 응답 코드: {response.status_code}")
-            response.raise_for_status()
-            data = response.json()
-            logger.info("OpenWeatherMap API로부터 JSON 데이터 파싱 성공")
+        data = await fetch_current_weather_data(city)
 
         weather_info = {
             "city": data.get("name"),
@@ -198,12 +245,16 @@ async def main():
     """서버의 메인 실행 함수."""
     from mcp.server.stdio import stdio_server
 
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    get_http_client()
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        await http_client.aclose()
 
 if __name__ == "__main__":
     import asyncio
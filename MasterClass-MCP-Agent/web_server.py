@@ -8,6 +8,7 @@ import asyncio
 import json
 import logging
 import os
+import uuid
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Dict, List, Any, Optional
@@ -71,6 +72,11 @@ async def lifespan(app: FastAPI):
         try:
             # mcp_servers.json 파일을 읽어 모든 서버에 연결
             await agent.connect_to_servers("mcp_servers.json")
+            for report in agent.startup_report:
+                logger.info(
+                    f"MCP 서버 시작 보고: {report['server']} ({report['transport']}) "
+                    f"{report['status']} {report['seconds']}초" + (f" - {report['error']}" if report['error'] else "")
+                )
             logger.info("✅ AI Agent 초기화 및 MCP 서버 연결 완료.")
         except Exception as e:
             logger.error(f"❌ AI Agent 초기화 또는 MCP 서버 연결 실패: {e}", exc_info=True)
@@ -140,10 +146,14 @@ async def websocket_endpoint(websocket: WebSocket):
         connected_clients.remove(websocket)
         return
 
+    # 재연결한 클라이언트는 이전 session_id로 같은 대화를 이어갑니다.
+    session_id = websocket.query_params.get("session_id") or uuid.uuid4().hex
+
     try:
         await websocket.send_json({
             "type": "connection",
             "message": "🤖 OpenAI MCP Agent에 연결되었습니다!",
+            "session_id": session_id,
             "timestamp": datetime.now().isoformat()
         })
         
@@ -154,8 +164,21 @@ async def websocket_endpoint(websocket: WebSocket):
             if message.get("type") == "query":
                 query = message.get("message", "")
                 logger.info(f"📩 쿼리 수신: {query}")
+                conversation = agent.conversations.get(session_id)
                 
-                response_text = await agent.run_query(query)
+                if message.get("stream", True):
+                    # 생성되는 대로 조각을 보내고, 마지막에 완성된 응답을 한 번 더 보냅니다.
+                    # 도구 호출 전 라운드의 텍스트는 중간 안내이므로 완성된 응답에는 마지막 라운드만 담습니다.
+                    parts = []
+                    current_round = 0
+                    async for round_index, chunk in agent.run_query_stream(query, conversation):
+                        if round_index != current_round:
+                            current_round, parts = round_index, []
+                        parts.append(chunk)
+                        await websocket.send_json({"type": "response_chunk", "round": round_index, "message": chunk})
+                    response_text = "".join(parts)
+                else:
+                    response_text = await agent.run_query(query, conversation)
                 
                 await websocket.send_json({
                     "type": "response",
@@ -212,19 +235,9 @@ async def list_tools():
     agent = app.state.agent
     if not agent or not hasattr(agent, "sessions"):
         return {"tools": []}
-    all_tools = []
-    for server_name, session in agent.sessions.items():
-        try:
-            tools_response = await session.list_tools()
-            for t in tools_response.tools:
-                all_tools.append({
-                    "name": t.name,
-                    "description": t.description,
-                    "server": server_name
-                })
-        except Exception:
-            continue
-    return {"tools": all_tools}
+    # 에이전트가 연결 시 캐시한 도구 카탈로그를 사용합니다.
+    await agent.tool_catalog.ensure_fresh(agent.sessions)
+    return {"tools": agent.tool_catalog.describe()}
 
 @app.post("/api/memory")
 async def add_memory(request: MemoryRequest):
@@ -362,8 +375,25 @@ async def list_servers():
     """연결된 MCP 서버 목록 반환"""
     agent = app.state.agent
     if not agent or not hasattr(agent, "sessions"):
-        return {"servers": []}
-    return {"servers": list(agent.sessions.keys())}
+        return {"servers": [], "startup": []}
+    return {"servers": list(agent.sessions.keys()), "startup": agent.startup_report}
+
+@app.get("/api/sessions")
+async def list_sessions():
+    """대화 세션 현황 반환"""
+    agent = app.state.agent
+    if not agent or not hasattr(agent, "conversations"):
+        return {"sessions": 0}
+    agent.conversations.evict_idle()
+    return agent.conversations.stats()
+
+@app.get("/api/tool-cache")
+async def tool_cache_stats():
+    """도구 결과 캐시 적중률 반환"""
+    agent = app.state.agent
+    if not agent or not hasattr(agent, "tool_cache"):
+        return {"tools": {}}
+    return agent.tool_cache.stats()
 
 @app.get("/health")
 async def health_check():
@@ -0,0 +1,109 @@
+"""OpenWeatherMap 대역 서버.
+
+벤치마크가 실제 API 할당량을 쓰지 않도록 /data/2.5/weather 와 /data/2.5/forecast 를
+흉내 냅니다. 응답 지연과 오류 비율을 설정할 수 있고, 받은 요청 수를 셉니다.
+
+단독 실행:
+    python benchmarks/fake_openweather.py --port 8090 --latency-ms 80 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+class FakeOpenWeather:
+    """지연 시간(평균 ± 지터)과 5xx 오류 비율을 설정할 수 있는 가짜 업스트림."""
+
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 10.0, error_rate: float = 0.0, seed: int | None = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.calls: Counter[str] = Counter()
+        self.errors = 0
+
+    async def _delay(self) -> None:
+        delay = max(self.random.gauss(self.latency_ms, self.jitter_ms), 0.0) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+
+    def _should_fail(self) -> bool:
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+    @staticmethod
+    def _city(request: Request) -> str:
+        return request.query_params.get("q") or f"City {request.query_params.get('id', '0')}"
+
+    async def weather(self, request: Request) -> JSONResponse:
+        self.calls["weather"] += 1
+        await self._delay()
+        if self._should_fail():
+            return JSONResponse({"cod": 500, "message": "injected error"}, status_code=500)
+        return JSONResponse({
+            "main": {"temp": round(self.random.uniform(-5, 30), 2), "humidity": self.random.randint(20, 95)},
+            "weather": [{"id": 802, "description": "scattered clouds"}],
+            "wind": {"speed": round(self.random.uniform(0, 12), 1)},
+            "name": self._city(request),
+            "timezone": 32400,
+        })
+
+    async def forecast(self, request: Request) -> JSONResponse:
+        self.calls["forecast"] += 1
+        await self._delay()
+        if self._should_fail():
+            return JSONResponse({"cod": "500", "message": "injected error"}, status_code=500)
+        count = int(request.query_params.get("cnt", "40"))
+        start = int(time.time()) // 10800 * 10800
+        points = [
+            {
+                "dt": start + i * 10800,
+                "main": {"temp": round(self.random.uniform(-5, 30), 2), "humidity": self.random.randint(20, 95)},
+                "weather": [{"id": 500, "description": "light rain"}],
+                "wind": {"speed": round(self.random.uniform(0, 12), 1)},
+            }
+            for i in range(count)
+        ]
+        return JSONResponse({
+            "cod": "200",
+            "cnt": count,
+            "list": points,
+            "city": {"name": self._city(request), "timezone": 32400},
+        })
+
+    async def stats(self, _: Request) -> JSONResponse:
+        return JSONResponse({"calls": dict(self.calls), "errors": self.errors})
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[
+            Route("/data/2.5/weather", self.weather),
+            Route("/data/2.5/forecast", self.forecast),
+            Route("/stats", self.stats),
+        ])
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="가짜 OpenWeatherMap 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    fake = FakeOpenWeather(args.latency_ms, args.jitter_ms, args.error_rate)
+    uvicorn.run(fake.app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
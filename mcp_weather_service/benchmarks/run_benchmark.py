@@ -0,0 +1,290 @@
+"""날씨 MCP 서버 부하 테스트.
+
+가짜 OpenWeatherMap 서버(fake_openweather.py)를 띄우고, 날씨 서버를 별도 프로세스로
+실행한 뒤 실제 MCP 세션(stdio 또는 HTTP)으로 `call_tool`/`read_resource`를 목표
+동시성으로 호출합니다. 지연 시간 백분위수, 처리량, 업스트림 호출 수를 출력하고
+JSON으로 저장합니다.
+
+사용 예:
+    python benchmarks/run_benchmark.py --transport stdio --concurrency 16 --requests 2000
+    python benchmarks/run_benchmark.py --transport streamable-http --workers 2 --duration 30 \\
+        --latency-ms 120 --error-rate 0.02 --output results/http-2w.json
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator
+from urllib.parse import quote
+
+import httpx
+import uvicorn
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from pydantic import AnyUrl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_openweather import FakeOpenWeather  # noqa: E402
+
+DEFAULT_CITIES = "Seoul,Busan,Incheon,Tokyo,London,Paris,New York,Sydney"
+OPERATIONS = ("read_resource", "get_forecast", "get_weather_batch")
+SERVER_COMMAND = "import sys, mcp_weather_service; mcp_weather_service.main()"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(ordered: list[float], pct: float) -> float | None:
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list[float]) -> dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        **{
+            f"p{pct}_ms": round(value * 1000, 3) if (value := percentile(ordered, pct)) is not None else None
+            for pct in (50, 95, 99)
+        },
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else None,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else None,
+    }
+
+
+@contextlib.asynccontextmanager
+async def fake_upstream(fake: FakeOpenWeather, port: int) -> AsyncIterator[str]:
+    """가짜 업스트림을 같은 이벤트 루프에서 실행하고 API 기본 URL을 돌려줍니다."""
+    server = uvicorn.Server(uvicorn.Config(fake.app(), host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}/data/2.5"
+    finally:
+        server.should_exit = True
+        await task
+
+
+def server_env(args: argparse.Namespace, api_base_url: str, cache_db: str) -> dict[str, str]:
+    env = {
+        **os.environ,
+        "OPENWEATHER_API_KEY": "benchmark",
+        "OPENWEATHER_API_BASE_URL": api_base_url,
+        "WEATHER_CACHE_DB": cache_db,
+        "WEATHER_UPSTREAM_RATE_PER_SECOND": str(args.upstream_rate),
+        "WEATHER_UPSTREAM_BURST": str(max(1, int(args.upstream_rate))),
+        "WEATHER_UPSTREAM_MAX_QUEUE": "10000",
+        "WEATHER_STATS_TOOL": "true",
+    }
+    if args.output_format:
+        env["WEATHER_OUTPUT_FORMAT"] = args.output_format
+    if args.cache_ttl_minutes is not None:
+        env["WEATHER_CACHE_TTL_MINUTES"] = str(args.cache_ttl_minutes)
+    return env
+
+
+@contextlib.asynccontextmanager
+async def open_session(args: argparse.Namespace, api_base_url: str) -> AsyncIterator[ClientSession]:
+    """날씨 서버 프로세스를 띄우고 MCP 세션을 엽니다.
+
+    실행마다 빈 임시 영속 캐시를 쓰고 끝나면 지워, 이전 실행의 레코드가 측정에 섞이지 않게 합니다.
+    """
+    with tempfile.TemporaryDirectory(prefix="mcp_weather_bench_", ignore_cleanup_errors=True) as cache_dir:
+        env = server_env(args, api_base_url, os.path.join(cache_dir, "cache.db"))
+        async with server_session(args, env) as session:
+            yield session
+
+
+@contextlib.asynccontextmanager
+async def server_session(args: argparse.Namespace, env: dict[str, str]) -> AsyncIterator[ClientSession]:
+    if args.transport == "stdio":
+        params = StdioServerParameters(command=sys.executable, args=["-c", SERVER_COMMAND], env=env)
+        # 서버 로그는 측정에 방해가 되지 않도록 버립니다.
+        with open(os.devnull, "w") as errlog:
+            async with stdio_client(params, errlog=errlog) as (read, write), ClientSession(read, write) as session:
+                await session.initialize()
+                yield session
+        return
+
+    port = free_port()
+    command = [
+        sys.executable, "-c", SERVER_COMMAND,
+        "--transport", "streamable-http", "--port", str(port), "--workers", str(args.workers),
+    ]
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        async with httpx.AsyncClient() as client:
+            for _ in range(200):
+                with contextlib.suppress(httpx.HTTPError):
+                    if (await client.get(f"http://127.0.0.1:{port}/metrics")).status_code == 200:
+                        break
+                await asyncio.sleep(0.05)
+            else:
+                raise RuntimeError("날씨 서버가 시작되지 않았습니다")
+        async with streamablehttp_client(f"http://127.0.0.1:{port}/mcp/") as (read, write, _), \
+                ClientSession(read, write) as session:
+            await session.initialize()
+            yield session
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+async def call(session: ClientSession, operation: str, city: str, cities: list[str], days: int) -> bool:
+    """한 번의 요청을 보내고 성공 여부를 반환합니다."""
+    if operation == "read_resource":
+        await session.read_resource(AnyUrl(f"weather://{quote(city)}/current"))
+        return True
+    if operation == "get_forecast":
+        result = await session.call_tool("get_forecast", {"city": city, "days": days})
+    else:
+        result = await session.call_tool("get_weather_batch", {"cities": cities[:5]})
+    return not result.isError
+
+
+async def drive(session: ClientSession, args: argparse.Namespace) -> dict[str, Any]:
+    """목표 동시성으로 요청을 보내고 결과를 모읍니다."""
+    cities = [city.strip() for city in args.cities.split(",") if city.strip()]
+    operations = [op.strip() for op in args.operations.split(",") if op.strip()]
+    workload = itertools.cycle(itertools.product(operations, cities))
+    latencies: dict[str, list[float]] = {operation: [] for operation in operations}
+    errors: dict[str, int] = {operation: 0 for operation in operations}
+    issued = 0
+    deadline = time.monotonic() + args.duration if args.duration else None
+
+    def next_request() -> tuple[str, str] | None:
+        nonlocal issued
+        if deadline is not None:
+            if time.monotonic() >= deadline:
+                return None
+        elif issued >= args.requests:
+            return None
+        issued += 1
+        return next(workload)
+
+    async def worker() -> None:
+        while (item := next_request()) is not None:
+            operation, city = item
+            started = time.perf_counter()
+            try:
+                ok = await call(session, operation, city, cities, args.days)
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - started
+            if ok:
+                latencies[operation].append(elapsed)
+            else:
+                errors[operation] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "duration_seconds": round(elapsed, 3),
+        "requests": issued,
+        "errors": sum(errors.values()),
+        "requests_per_second": round(issued / elapsed, 2) if elapsed else None,
+        "latency": summarize(all_latencies),
+        "by_operation": {
+            operation: {**summarize(latencies[operation]), "errors": errors[operation]} for operation in operations
+        },
+    }
+
+
+async def server_stats(session: ClientSession) -> dict[str, Any] | None:
+    with contextlib.suppress(Exception):
+        result = await session.call_tool("get_server_stats", {})
+        if not result.isError:
+            return json.loads(result.content[0].text)
+    return None
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    fake = FakeOpenWeather(args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed)
+    async with fake_upstream(fake, free_port()) as api_base_url:
+        async with open_session(args, api_base_url) as session:
+            if args.warmup:
+                warmup = argparse.Namespace(**{**vars(args), "requests": args.warmup, "duration": 0})
+                await drive(session, warmup)
+                fake.calls.clear()
+            report = await drive(session, args)
+            stats = await server_stats(session)
+
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": vars(args),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        **report,
+        "upstream": {"calls": sum(fake.calls.values()), "by_endpoint": dict(fake.calls), "injected_errors": fake.errors},
+        "server_stats": stats,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="날씨 MCP 서버 부하 테스트")
+    parser.add_argument("--transport", choices=("stdio", "streamable-http"), default="stdio")
+    parser.add_argument("--workers", type=int, default=1, help="streamable-http 워커 프로세스 수")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000, help="보낼 요청 수 (--duration이 없을 때)")
+    parser.add_argument("--duration", type=float, default=0, help="지정하면 요청 수 대신 이 시간(초) 동안 실행")
+    parser.add_argument("--warmup", type=int, default=0, help="측정 전에 보낼 요청 수")
+    parser.add_argument("--operations", default="read_resource,get_forecast", help=f"쉼표로 구분 ({', '.join(OPERATIONS)})")
+    parser.add_argument("--cities", default=DEFAULT_CITIES)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="가짜 업스트림 평균 지연 시간")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="가짜 업스트림 5xx 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--upstream-rate", type=float, default=1000.0, help="서버의 업스트림 초당 호출 한도")
+    parser.add_argument("--cache-ttl-minutes", type=int, default=None)
+    parser.add_argument("--output-format", choices=("pretty", "compact"), default=None)
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본값: benchmarks/results/<시각>-<전송>.json)")
+    args = parser.parse_args()
+    unknown = set(args.operations.split(",")) - set(OPERATIONS)
+    if unknown:
+        parser.error(f"알 수 없는 작업: {', '.join(sorted(unknown))}")
+    if args.transport == "stdio" and args.workers != 1:
+        parser.error("--workers는 streamable-http 전송에서만 사용할 수 있습니다")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    result = asyncio.run(run(args))
+
+    output = Path(args.output) if args.output else (
+        Path(__file__).resolve().parent / "results" / f"{datetime.now():%Y%m%d-%H%M%S}-{args.transport}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    latency = result["latency"]
+    print(f"전송: {args.transport}, 동시성: {args.concurrency}, 요청: {result['requests']}, 오류: {result['errors']}")
+    print(f"처리량: {result['requests_per_second']} req/s")
+    print(f"지연 시간: p50 {latency['p50_ms']}ms, p95 {latency['p95_ms']}ms, p99 {latency['p99_ms']}ms")
+    print(f"업스트림 호출: {result['upstream']['calls']} {result['upstream']['by_endpoint']}")
+    print(f"결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
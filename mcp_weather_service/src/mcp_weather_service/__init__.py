@@ -1,6 +1,31 @@
 from . import server
+import argparse
 import asyncio
+import os
 
 def main():
     """패키지의 메인 진입점."""
-    asyncio.run(server.main()) 
\ No newline at end of file
+    from .transport import TRANSPORTS, run_workers
+
+    parser = argparse.ArgumentParser(description="OpenWeatherMap 날씨 MCP 서버")
+    parser.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default=os.getenv("WEATHER_TRANSPORT", "stdio"),
+        help="전송 방식 (기본값: stdio, 환경 변수 WEATHER_TRANSPORT)",
+    )
+    parser.add_argument("--host", default=os.getenv("WEATHER_HOST", "127.0.0.1"), help="HTTP 전송 시 바인딩할 주소")
+    parser.add_argument("--port", type=int, default=int(os.getenv("WEATHER_PORT", "8001")), help="HTTP 전송 시 포트")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEATHER_WORKERS", "1")),
+        help="HTTP 워커 프로세스 수 (streamable-http 전용, 워커들은 SQLite 캐시를 공유)",
+    )
+    args = parser.parse_args()
+    if args.workers > 1:
+        if args.transport != "streamable-http":
+            parser.error("--workers는 --transport streamable-http와 함께 사용해야 합니다")
+        run_workers(args.transport, args.host, args.port, args.workers)
+        return
+    asyncio.run(server.main(args.transport, args.host, args.port))
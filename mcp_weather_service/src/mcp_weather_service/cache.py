@@ -0,0 +1,180 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, field
+from datetime import timedelta
+from typing import Any, Callable, Hashable
+
+
+@dataclass
+class CacheStats:
+    """캐시 적중/실패/축출 카운터."""
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 4)}
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+    accessed_at: float
+    ttl: float
+    hard_ttl: float
+    # 값의 직렬화 결과 (형식별). 값이 교체되면 항목과 함께 버려집니다.
+    rendered: dict[Hashable, Any] = field(default_factory=dict)
+
+
+class TTLCache:
+    """키별 TTL과 LRU 축출을 지원하는 인메모리 캐시.
+
+    항목은 저장 시각으로부터 `ttl`(soft TTL)이 지나면 오래된(stale) 상태가 되고,
+    `hard_ttl`이 지나면 만료됩니다. 두 시점 사이에는 오래된 값을 그대로 반환하여
+    호출자가 백그라운드에서 갱신할 수 있게 합니다. `max_entries`를 넘으면 가장
+    오래 사용되지 않은 항목부터 축출됩니다. 만료된 항목은 축출될 때까지 `peek()`으로
+    조회할 수 있습니다.
+
+    `add_listener()`로 등록한 콜백은 항목이 저장되면 `(키, 값)`, 제거되면 `(키, None)`으로
+    호출되어 캐시 내용을 따라가는 색인을 점진적으로 유지할 수 있습니다.
+    """
+
+    def __init__(self, ttl: timedelta, max_entries: int = 256, hard_ttl: timedelta | None = None):
+        if max_entries < 1:
+            raise ValueError("max_entries는 1 이상이어야 합니다")
+        if hard_ttl is not None and hard_ttl < ttl:
+            raise ValueError("hard_ttl은 ttl보다 짧을 수 없습니다")
+        self.ttl = ttl
+        self.hard_ttl = hard_ttl or ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._listeners: list[Callable[[Hashable, Any], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add_listener(self, listener: Callable[[Hashable, Any], None]) -> None:
+        self._listeners.append(listener)
+
+    def _emit(self, key: Hashable, value: Any) -> None:
+        for listener in self._listeners:
+            listener(key, value)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and self._age(entry) <= entry.hard_ttl
+
+    @staticmethod
+    def _age(entry: CacheEntry) -> float:
+        return time.monotonic() - entry.stored_at
+
+    def lookup(self, key: Hashable) -> tuple[Any | None, bool]:
+        """(값, stale 여부)를 반환합니다. 없거나 hard TTL이 지난 경우 (None, False)입니다."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None, False
+        age = self._age(entry)
+        if age > entry.hard_ttl:
+            # 만료된 항목도 LRU로 축출될 때까지 마지막 값(last-known)으로 보관합니다.
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None, False
+        entry.accessed_at = time.monotonic()
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        stale = age > entry.ttl
+        if stale:
+            self.stats.stale_hits += 1
+        return entry.value, stale
+
+    def get(self, key: Hashable) -> Any | None:
+        """캐시된 값을 반환합니다. 없거나 만료된 경우 None을 반환합니다."""
+        return self.lookup(key)[0]
+
+    def peek(self, key: Hashable) -> Any | None:
+        """만료 여부와 관계없이 마지막으로 저장된 값을 반환합니다. 통계에는 반영되지 않습니다.
+
+        업스트림 장애 시 마지막으로 알려진 데이터를 제공하는 데 사용합니다.
+        """
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def memoize(self, key: Hashable, value: Any, variant: Hashable, build: Callable[[], Any]) -> Any:
+        """`value`에서 파생된 결과(예: 직렬화된 JSON)를 항목과 함께 캐시합니다.
+
+        항목의 값이 `value`와 같은 객체일 때만 저장된 결과를 사용하므로, 그 사이
+        값이 갱신되었다면 새로 만듭니다.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.value is not value:
+            return build()
+        if variant not in entry.rendered:
+            entry.rendered[variant] = build()
+        return entry.rendered[variant]
+
+    def set(self, key: Hashable, value: Any, age: float = 0.0, ttl: timedelta | None = None) -> None:
+        """값을 저장하고 필요하면 LRU 항목을 축출합니다.
+
+        `age`는 값이 이미 경과한 시간(초)으로, 영속 저장소에서 불러온 값에 사용합니다.
+        `ttl`을 지정하면 이 항목의 soft TTL을 바꾸며, stale 허용 구간의 길이는 유지됩니다.
+        """
+        soft = (ttl or self.ttl).total_seconds()
+        hard = soft + (self.hard_ttl - self.ttl).total_seconds()
+        now = time.monotonic()
+        previous = self._entries.get(key)
+        accessed_at = previous.accessed_at if previous else now
+        self._entries[key] = CacheEntry(value, stored_at=now - age, accessed_at=accessed_at, ttl=soft, hard_ttl=hard)
+        self._entries.move_to_end(key)
+        self._emit(key, value)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self.stats.evictions += 1
+            self._emit(evicted, None)
+
+    def touch(self, key: Hashable) -> bool:
+        """항목을 방금 조회된 것으로 표시합니다. 유효한 항목이 없으면 False를 반환합니다."""
+        entry = self._entries.get(key)
+        if entry is None or self._age(entry) > entry.hard_ttl:
+            return False
+        entry.accessed_at = time.monotonic()
+        return True
+
+    def hot_keys(self, accessed_within: timedelta, stale_within: timedelta) -> list[Hashable]:
+        """최근 `accessed_within` 안에 조회되었고 `stale_within` 안에 stale 상태가 되는 키 목록."""
+        now = time.monotonic()
+        return [
+            key for key, entry in self._entries.items()
+            if now - entry.accessed_at <= accessed_within.total_seconds()
+            and entry.stored_at + entry.ttl - now <= stale_within.total_seconds()
+        ]
+
+    def freshness(self, key: Hashable) -> tuple[float, str] | None:
+        """(저장 후 경과 초, "fresh"/"stale"/"expired")를 반환합니다. 조회 통계에는 반영하지 않습니다."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = self._age(entry)
+        state = "fresh" if age <= entry.ttl else "stale" if age <= entry.hard_ttl else "expired"
+        return age, state
+
+    def invalidate(self, key: Hashable) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._emit(key, None)
+
+    def clear(self) -> None:
+        """모든 항목과 통계를 초기화합니다."""
+        keys = list(self._entries)
+        self._entries.clear()
+        self.stats = CacheStats()
+        for key in keys:
+            self._emit(key, None)
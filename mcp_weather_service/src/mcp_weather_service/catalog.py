@@ -0,0 +1,74 @@
+import base64
+import bisect
+import json
+
+
+class ResourceCatalog:
+    """리소스 목록에 노출할 도시들을 이름순으로 유지하는 색인.
+
+    캐시가 바뀔 때마다 `update()`로 한 항목씩 반영하므로 목록 요청 시 전체를 다시
+    만들지 않습니다. `pin()`으로 등록한 도시는 캐시에서 빠져도 목록에 남습니다.
+    페이지 커서는 마지막 항목의 정렬 키라서 중간에 항목이 추가되거나 제거되어도
+    다음 페이지가 어긋나지 않습니다.
+    """
+
+    def __init__(self):
+        self._names: dict[str, str] = {}
+        self._order: list[tuple[str, str]] = []
+        self._pinned: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @staticmethod
+    def _sort_key(key: str, name: str) -> tuple[str, str]:
+        return name.casefold(), key
+
+    def pin(self, key: str, name: str) -> None:
+        self._pinned.add(key)
+        self._add(key, name)
+
+    def update(self, key: str, name: str | None) -> None:
+        """캐시 항목이 저장되면 이름과 함께, 제거되면 None으로 호출합니다."""
+        if name is not None:
+            self._add(key, name)
+        elif key not in self._pinned:
+            self._remove(key)
+
+    def _add(self, key: str, name: str) -> None:
+        current = self._names.get(key)
+        if current == name:
+            return
+        if current is not None:
+            self._remove(key)
+        self._names[key] = name
+        bisect.insort(self._order, self._sort_key(key, name))
+
+    def _remove(self, key: str) -> None:
+        name = self._names.pop(key, None)
+        if name is None:
+            return
+        sort_key = self._sort_key(key, name)
+        index = bisect.bisect_left(self._order, sort_key)
+        if index < len(self._order) and self._order[index] == sort_key:
+            del self._order[index]
+
+    def page(self, cursor: str | None, limit: int) -> tuple[list[tuple[str, str]], str | None]:
+        """커서 다음부터 최대 `limit`개의 (키, 이름)과 다음 페이지 커서를 반환합니다."""
+        start = 0 if cursor is None else bisect.bisect_right(self._order, self._decode_cursor(cursor))
+        window = self._order[start:start + limit]
+        items = [(key, self._names[key]) for _, key in window]
+        next_cursor = self._encode_cursor(window[-1]) if window and start + limit < len(self._order) else None
+        return items, next_cursor
+
+    @staticmethod
+    def _encode_cursor(sort_key: tuple[str, str]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(sort_key, ensure_ascii=False).encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[str, str]:
+        try:
+            name, key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return str(name), str(key)
+        except Exception:
+            raise ValueError(f"잘못된 페이지 커서: {cursor}")
@@ -0,0 +1,111 @@
+import json
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib import resources
+from typing import Any
+
+_WHITESPACE = re.compile(r"\s+")
+
+# 기억해 둘 색인 밖 도시 이름의 최대 개수
+MAX_UNINDEXED_NAMES = 4096
+
+
+def normalize_city_name(name: str) -> str:
+    """대소문자, 공백, 유니코드 표현 차이를 없앤 조회용 도시 이름을 반환합니다."""
+    name = unicodedata.normalize("NFKC", name)
+    return _WHITESPACE.sub(" ", name).strip().casefold()
+
+
+@dataclass(frozen=True)
+class City:
+    """도시 색인의 한 항목 (OpenWeatherMap 도시 ID 기준)."""
+    id: int
+    name: str
+    country: str
+
+
+@dataclass(frozen=True)
+class CityRef:
+    """요청된 도시 이름을 해석한 결과.
+
+    색인에 있는 도시는 도시 ID를 캐시 키와 업스트림 파라미터로 사용하고,
+    없는 도시는 정규화된 이름을 키로, 원래 이름을 `q=` 파라미터로 사용합니다.
+    """
+    key: str
+    name: str
+    params: dict[str, Any]
+    city: City | None = None
+
+
+class CityIndex:
+    """별칭, 대소문자 변형, 한국어/영어 이름을 도시 ID로 매핑하는 색인."""
+
+    def __init__(self, cities: list[City], aliases: dict[str, City]):
+        self.cities = cities
+        self._aliases = aliases
+        self._by_id = {str(city.id): city for city in cities}
+        # 색인에 없는 도시의 캐시 키 -> 처음 요청된 이름. from_key()가 표시 이름을 되살리는 데 씁니다.
+        self._unindexed: dict[str, CityRef] = {}
+
+    def __len__(self) -> int:
+        return len(self.cities)
+
+    @classmethod
+    def from_records(cls, records: list[list[Any]]) -> "CityIndex":
+        cities = []
+        aliases: dict[str, City] = {}
+        for city_id, name, country, city_aliases in records:
+            city = City(id=city_id, name=name, country=country)
+            cities.append(city)
+            for alias in (name, f"{name},{country}", *city_aliases):
+                aliases.setdefault(normalize_city_name(alias), city)
+        return cls(cities, aliases)
+
+    def lookup(self, name: str) -> City | None:
+        """도시 이름(또는 'Seoul,KR' 형식)에 해당하는 도시를 찾습니다.
+
+        국가 코드가 색인된 도시의 국가와 다르면('London,CA') 다른 도시이므로 찾지 않습니다.
+        """
+        normalized = normalize_city_name(name)
+        city = self._aliases.get(normalized)
+        if city is None and "," in normalized:
+            city_name, country = (part.strip() for part in normalized.split(",", 1))
+            city = self._aliases.get(city_name)
+            if city is not None and country and city.country.casefold() != country:
+                return None
+        return city
+
+    def resolve(self, name: str) -> CityRef:
+        """요청된 도시 이름을 캐시 키와 업스트림 파라미터로 해석합니다."""
+        city = self.lookup(name)
+        if city is not None:
+            return CityRef(key=str(city.id), name=city.name, params={"id": city.id}, city=city)
+        key = normalize_city_name(name)
+        ref = self._unindexed.get(key)
+        if ref is None:
+            stripped = _WHITESPACE.sub(" ", name).strip()
+            ref = CityRef(key=key, name=stripped, params={"q": stripped})
+            if len(self._unindexed) >= MAX_UNINDEXED_NAMES:
+                self._unindexed.pop(next(iter(self._unindexed)))
+            self._unindexed[key] = ref
+        return ref
+
+    def from_key(self, key: str) -> CityRef:
+        """캐시 키로부터 CityRef를 다시 만듭니다. 백그라운드 갱신에 사용합니다."""
+        city = self._by_id.get(key)
+        if city is not None:
+            return CityRef(key=key, name=city.name, params={"id": city.id}, city=city)
+        return self._unindexed.get(key) or self.resolve(key)
+
+
+@lru_cache(maxsize=1)
+def get_city_index() -> CityIndex:
+    """패키지에 포함된 도시 색인을 처음 사용할 때 한 번만 불러옵니다."""
+    data = json.loads(resources.files(__package__).joinpath("data").joinpath("cities.json").read_text(encoding="utf-8"))
+    return CityIndex.from_records(data["cities"])
+
+
+def resolve_city(name: str) -> CityRef:
+    return get_city_index().resolve(name)
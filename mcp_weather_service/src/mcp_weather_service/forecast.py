@@ -0,0 +1,113 @@
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any
+
+SECONDS_PER_DAY = 86400
+
+
+class ForecastSeries:
+    """3시간 간격 예보를 열(column) 단위 배열로 보관합니다.
+
+    업스트림 응답을 한 번만 파싱하여 타임스탬프, 기온, 습도, 풍속, 날씨 코드를
+    각각 연속된 배열에 담고, 일별 집계(최저/최고/평균, 대표 날씨)는 생성 시
+    한 번 계산해 함께 보관합니다.
+    """
+
+    __slots__ = ("timestamps", "temp", "humidity", "wind", "codes", "descriptions", "tz_offset", "daily")
+
+    def __init__(
+        self,
+        timestamps: array,
+        temp: array,
+        humidity: array,
+        wind: array,
+        codes: array,
+        descriptions: dict[int, str],
+        tz_offset: int = 0,
+    ):
+        self.timestamps = timestamps
+        self.temp = temp
+        self.humidity = humidity
+        self.wind = wind
+        self.codes = codes
+        self.descriptions = descriptions
+        self.tz_offset = tz_offset
+        self.daily = self._aggregate_daily()
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_response(cls, data: dict[str, Any]) -> "ForecastSeries":
+        """OpenWeatherMap /forecast 응답을 파싱합니다."""
+        items = data["list"]
+        descriptions: dict[int, str] = {}
+        for item in items:
+            weather = item["weather"][0]
+            descriptions.setdefault(weather.get("id", 0), weather["description"])
+        return cls(
+            timestamps=array("q", (item["dt"] for item in items)),
+            temp=array("d", (item["main"]["temp"] for item in items)),
+            humidity=array("d", (item["main"]["humidity"] for item in items)),
+            wind=array("d", (item["wind"]["speed"] for item in items)),
+            codes=array("H", (item["weather"][0].get("id", 0) for item in items)),
+            descriptions=descriptions,
+            tz_offset=data.get("city", {}).get("timezone", 0),
+        )
+
+    def _day_bounds(self) -> list[tuple[int, int, int]]:
+        """(현지 날짜 번호, 시작 인덱스, 끝 인덱스) 목록을 반환합니다."""
+        day_numbers = [(ts + self.tz_offset) // SECONDS_PER_DAY for ts in self.timestamps]
+        bounds = []
+        start = 0
+        for i in range(1, len(day_numbers) + 1):
+            if i == len(day_numbers) or day_numbers[i] != day_numbers[start]:
+                bounds.append((day_numbers[start], start, i))
+                start = i
+        return bounds
+
+    def _aggregate_daily(self) -> list[dict[str, Any]]:
+        daily = []
+        for day, start, end in self._day_bounds():
+            temps = self.temp[start:end]
+            count = end - start
+            code = Counter(self.codes[start:end]).most_common(1)[0][0]
+            daily.append({
+                "date": datetime.fromtimestamp(day * SECONDS_PER_DAY, tz=timezone.utc).date().isoformat(),
+                "temperature": round(sum(temps) / count, 2),
+                "temp_min": min(temps),
+                "temp_max": max(temps),
+                "humidity": round(sum(self.humidity[start:end]) / count, 1),
+                "wind_speed": max(self.wind[start:end]),
+                "conditions": self.descriptions.get(code, ""),
+            })
+        return daily
+
+    def daily_forecast(self, days: int) -> list[dict[str, Any]]:
+        """앞에서부터 `days`일치 일별 집계를 반환합니다."""
+        return self.daily[:days]
+
+    def to_dict(self) -> dict[str, Any]:
+        """영속 저장용 직렬화 형식."""
+        return {
+            "timestamps": self.timestamps.tolist(),
+            "temp": self.temp.tolist(),
+            "humidity": self.humidity.tolist(),
+            "wind": self.wind.tolist(),
+            "codes": self.codes.tolist(),
+            "descriptions": {str(code): text for code, text in self.descriptions.items()},
+            "tz_offset": self.tz_offset,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ForecastSeries":
+        return cls(
+            timestamps=array("q", data["timestamps"]),
+            temp=array("d", data["temp"]),
+            humidity=array("d", data["humidity"]),
+            wind=array("d", data["wind"]),
+            codes=array("H", data["codes"]),
+            descriptions={int(code): text for code, text in data["descriptions"].items()},
+            tz_offset=data.get("tz_offset", 0),
+        )
@@ -0,0 +1,223 @@
+import bisect
+import math
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator
+
+# 초 단위 지연 시간 버킷 (1ms ~ 10s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 수집 시점에 계산되는 값: (이름, 종류, 설명, 레이블, 값)
+Sample = tuple[str, str, str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _finite(value: float | None) -> float | None:
+    return value if value is not None and math.isfinite(value) else None
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], Any] = {}
+
+    def labels(self, **labels: str):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _items(self) -> Iterator[tuple[dict[str, str], Any]]:
+        for key, child in self._children.items():
+            yield dict(zip(self.labelnames, key)), child
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        """블록 실행 중에만 값을 1 올립니다 (진행 중인 요청 수)."""
+        child = self.labels(**labels)
+        child.inc()
+        try:
+            yield
+        finally:
+            child.dec()
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def quantile(self, q: float) -> float | None:
+        """q 분위수가 속한 버킷의 상한을 반환합니다 (보수적인 근사치)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+
+class MetricsRegistry:
+    """가벼운 인프로세스 카운터/게이지/히스토그램 모음.
+
+    관측은 딕셔너리 조회와 덧셈 정도라 운영 환경에서 항상 켜 둘 수 있습니다.
+    다른 구성 요소가 이미 가진 통계(캐시, 속도 제한기 등)는 수집기 함수로 등록해
+    내보낼 때만 읽습니다.
+    """
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
+
+    def _register(self, metric: _Metric) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    def _collected(self) -> dict[str, tuple[str, str, list[tuple[dict[str, str], float]]]]:
+        families: dict[str, tuple[str, str, list[tuple[dict[str, str], float]]]] = {}
+        for collector in self._collectors:
+            for name, kind, help, labels, value in collector():
+                families.setdefault(name, (kind, help, []))[2].append((labels, value))
+        return families
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식(0.0.4)으로 모든 지표를 내보냅니다."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, child in metric._items():
+                if isinstance(child, _Buckets):
+                    cumulative = 0
+                    for bound, count in zip((*child.bounds, math.inf), child.counts):
+                        cumulative += count
+                        bucket_labels = {**labels, "le": _format_value(bound)}
+                        lines.append(f"{metric.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(child.sum)}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {child.count}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(child.value)}")
+        for name, (kind, help, samples) in self._collected().items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        """사람(과 LLM)이 읽기 쉬운 요약. 히스토그램은 횟수, 평균, 근사 백분위수로 줄입니다."""
+        result: dict[str, Any] = {}
+        for metric in self._metrics:
+            series = {}
+            for labels, child in metric._items():
+                label = ",".join(f"{k}={v}" for k, v in labels.items()) or "total"
+                if isinstance(child, _Buckets):
+                    series[label] = {
+                        "count": child.count,
+                        "avg_seconds": round(child.sum / child.count, 6) if child.count else None,
+                        **{f"p{q}_seconds_le": _finite(child.quantile(q / 100)) for q in (50, 95, 99)},
+                    }
+                else:
+                    series[label] = child.value
+            result[metric.name] = series
+        for name, (_, _, samples) in self._collected().items():
+            result[name] = {
+                ",".join(f"{k}={v}" for k, v in labels.items()) or "total": value for labels, value in samples
+            }
+        return result
@@ -0,0 +1,137 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator
+
+
+class Priority(IntEnum):
+    """업스트림 호출 우선순위. 값이 작을수록 먼저 처리됩니다."""
+    USER = 0
+    REFRESH = 1
+
+
+class UpstreamOverloadedError(RuntimeError):
+    """대기열이 가득 차 업스트림 요청을 즉시 거절했을 때 발생합니다."""
+
+
+class UpstreamLimiter:
+    """토큰 버킷 속도 제한과 최대 동시 요청 수를 함께 적용하는 승인 제어기.
+
+    토큰이나 동시성 슬롯이 없으면 우선순위 대기열에서 기다리며, 사용자 요청이
+    캐시 갱신 요청보다 먼저 처리됩니다. 대기열이 가득 차면 기다리지 않고 즉시
+    UpstreamOverloadedError를 발생시킵니다. 갱신 요청은 대기열의 절반까지만
+    사용할 수 있습니다.
+    """
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int, max_queue: int):
+        if rate <= 0 or burst < 1 or max_concurrency < 1:
+            raise ValueError("rate, burst, max_concurrency는 양수여야 합니다")
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        # 지표
+        self.admitted = 0
+        self.shed = {priority.name.lower(): 0 for priority in Priority}
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _can_admit(self) -> bool:
+        self._refill()
+        return self._active < self.max_concurrency and self._tokens >= 1
+
+    def _admit(self) -> None:
+        self._tokens -= 1
+        self._active += 1
+        self.admitted += 1
+
+    def _wake(self) -> None:
+        """대기 중인 요청을 우선순위 순서로 가능한 만큼 승인합니다."""
+        while self._waiters and self._can_admit():
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue
+            self._admit()
+            fut.set_result(None)
+
+        if self._waiters and self._timer is None and self._active < self.max_concurrency:
+            # 토큰이 부족하면 다음 토큰이 생기는 시점에 다시 깨웁니다.
+            delay = max((1 - self._tokens) / self.rate, 0.0)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._wake()
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def acquire(self, priority: Priority = Priority.USER) -> AsyncIterator[None]:
+        """업스트림 호출 하나를 승인받습니다. 블록을 벗어나면 슬롯이 반환됩니다."""
+        if not self._waiters and self._can_admit():
+            self._admit()
+            self._record_wait(0.0)
+        else:
+            limit = self.max_queue if priority == Priority.USER else self.max_queue // 2
+            if self.queue_depth >= limit:
+                self.shed[priority.name.lower()] += 1
+                raise UpstreamOverloadedError("업스트림 요청 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+
+            fut = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (int(priority), next(self._sequence), fut))
+            started = time.monotonic()
+            self._wake()
+            try:
+                await fut
+            except asyncio.CancelledError:
+                # 승인 직후 취소된 경우 받은 슬롯을 돌려줍니다.
+                if fut.done() and not fut.cancelled():
+                    self._release()
+                raise
+            self._record_wait(time.monotonic() - started)
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def backoff(self, seconds: float) -> None:
+        """업스트림이 429를 반환했을 때 `seconds` 동안 새 요청을 승인하지 않습니다."""
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def _record_wait(self, waited: float) -> None:
+        self.wait_count += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "active": self._active,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "wait_avg_seconds": round(self.wait_total / self.wait_count, 4) if self.wait_count else 0.0,
+            "wait_max_seconds": round(self.wait_max, 4),
+        }
@@ -0,0 +1,163 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """회로가 열려 있어 업스트림을 호출하지 않고 즉시 실패할 때 발생합니다."""
+
+
+class CircuitBreaker:
+    """엔드포인트별 회로 차단기.
+
+    연속 실패가 `failure_threshold`에 도달하면 회로를 열고 `reset_timeout` 동안
+    모든 호출을 즉시 거절합니다. 그 후에는 시험 호출 하나만 허용하여(half-open)
+    성공하면 회로를 닫고, 실패하면 다시 엽니다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        # 지표
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self) -> None:
+        """호출 가능 여부를 확인합니다. 불가능하면 CircuitOpenError를 발생시킵니다."""
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._trial_in_flight):
+            self.rejected += 1
+            raise CircuitOpenError(f"'{self.name}' 업스트림 회로가 열려 있습니다. 잠시 후 다시 시도하세요.")
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_cancelled(self) -> None:
+        """결과를 알 수 없는 호출: half-open 시험 호출 자리만 돌려줍니다."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class LatencyTracker:
+    """최근 요청 지연 시간의 백분위수를 계산합니다."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class Hedger:
+    """첫 시도가 지연 시간 백분위수 임계값을 넘으면 두 번째 요청을 보냅니다.
+
+    먼저 성공한 결과를 사용하고 나머지 시도는 취소합니다. 표본이
+    `min_samples`보다 적으면 헤징하지 않습니다.
+    """
+
+    def __init__(self, enabled: bool = False, percentile: float = 95.0, min_samples: int = 20):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.latency = LatencyTracker()
+        # 지표
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def threshold(self) -> float | None:
+        if not self.enabled or len(self.latency) < self.min_samples:
+            return None
+        return self.latency.percentile(self.percentile)
+
+    async def run(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        """`attempt`를 실행하고 필요하면 헤지 요청을 함께 보냅니다."""
+        threshold = self.threshold()
+        first = asyncio.ensure_future(self._timed(attempt))
+        if threshold is None:
+            return await first
+
+        try:
+            done, _ = await asyncio.wait({first}, timeout=threshold)
+        except asyncio.CancelledError:
+            first.cancel()
+            raise
+        if done:
+            return first.result()
+
+        self.hedged += 1
+        second = asyncio.ensure_future(self._timed(attempt))
+        pending = {first, second}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _timed(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        started = time.monotonic()
+        result = await attempt()
+        self.latency.record(time.monotonic() - started)
+        return result
+
+    def metrics(self) -> dict[str, Any]:
+        p = self.latency.percentile(self.percentile)
+        return {
+            "enabled": self.enabled,
+            f"latency_p{self.percentile:g}_seconds": round(p, 4) if p is not None else None,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }
@@ -0,0 +1,68 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # 선택적 의존성: pip install mcp_weather_service[fast]
+    orjson = None
+
+# compact 모드에서 사용하는 짧은 키 (도구 설명에 범례로 안내됩니다)
+COMPACT_KEYS = {
+    "city": "c",
+    "temperature": "t",
+    "temp_min": "tn",
+    "temp_max": "tx",
+    "conditions": "w",
+    "humidity": "h",
+    "wind_speed": "ws",
+    "timestamp": "ts",
+    "date": "d",
+    "results": "r",
+    "errors": "e",
+}
+
+
+def shorten_keys(obj: Any) -> Any:
+    """딕셔너리 키를 COMPACT_KEYS에 따라 재귀적으로 줄입니다."""
+    if isinstance(obj, dict):
+        return {COMPACT_KEYS.get(key, key): shorten_keys(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [shorten_keys(item) for item in obj]
+    return obj
+
+
+class PayloadSerializer:
+    """도구/리소스 응답을 JSON 문자열로 직렬화합니다.
+
+    pretty 모드는 기존 출력(들여쓰기 2칸, 원래 키)을 유지하고, compact 모드는
+    들여쓰기 없이 짧은 키를 사용합니다. orjson이 설치되어 있으면 사용합니다.
+    """
+
+    def __init__(self, compact: bool = False, use_orjson: bool = True):
+        self.compact = compact
+        self.use_orjson = use_orjson and orjson is not None
+
+    @property
+    def encoder(self) -> str:
+        return "orjson" if self.use_orjson else "json"
+
+    def key(self, name: str) -> str:
+        """현재 모드에서 사용하는 키 이름을 반환합니다."""
+        return COMPACT_KEYS.get(name, name) if self.compact else name
+
+    def dumps(self, obj: Any, inline: bool = False) -> str:
+        """`obj`를 JSON 문자열로 만듭니다. `inline`이면 모드와 관계없이 들여쓰기하지 않습니다."""
+        if self.compact:
+            obj = shorten_keys(obj)
+        indent = not (self.compact or inline)
+        if self.use_orjson:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+        if indent:
+            return json.dumps(obj, indent=2, ensure_ascii=False)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def join_object(self, fragments: dict[str, str]) -> str:
+        """이미 직렬화된 JSON 조각들을 다시 인코딩하지 않고 하나의 객체로 잇습니다."""
+        return "{" + ",".join(
+            f"{json.dumps(name, ensure_ascii=False)}:{fragment}" for name, fragment in fragments.items()
+        ) + "}"
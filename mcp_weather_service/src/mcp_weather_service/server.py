@@ -1,12 +1,16 @@
 import os
-import json
+import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Any
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable
+from urllib.parse import quote, unquote
 
 import httpx
 from dotenv import load_dotenv
-from mcp.server import Server
+from mcp.server import NotificationOptions, Server
 from mcp.types import (
     Resource,
     Tool,
@@ -15,9 +19,28 @@ from mcp.types import (
     EmbeddedResource,
     LoggingLevel,
     EmptyResult,
+    ListResourcesRequest,
+    ListResourcesResult,
+    ServerResult,
+    ServerCapabilities,
+    SubscribeRequest,
+    UnsubscribeRequest,
 )
 from pydantic import AnyUrl
 
+from .cache import TTLCache
+from .catalog import ResourceCatalog
+from .cities import CityRef, get_city_index, resolve_city
+from .forecast import ForecastSeries
+from .metrics import MetricsRegistry, Sample
+from .ratelimit import Priority, UpstreamLimiter
+from .resilience import CircuitBreaker, CircuitOpenError, Hedger
+from .serialization import PayloadSerializer
+from .singleflight import CrossProcessFlight, SingleFlight
+from .store import SQLiteWeatherStore
+from .subscriptions import SubscriptionRegistry
+from .upstream import create_http_client, pool_metrics
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -30,7 +53,7 @@ API_KEY = os.getenv("OPENWEATHER_API_KEY")
 if not API_KEY:
     raise ValueError("OPENWEATHER_API_KEY 환경 변수가 필요합니다")
 
-API_BASE_URL = "http://api.openweathermap.org/data/2.5"
+API_BASE_URL = os.getenv("OPENWEATHER_API_BASE_URL", "http://api.openweathermap.org/data/2.5")
 DEFAULT_CITY = "Seoul"
 
 http_params = {
@@ -38,81 +61,583 @@ http_params = {
     "units": "metric"
 }
 
+# 배치 도구 설정
+BATCH_MAX_CITIES = int(os.getenv("WEATHER_BATCH_MAX_CITIES", "100"))
+BATCH_CONCURRENCY = int(os.getenv("WEATHER_BATCH_CONCURRENCY", "8"))
+
+# 서버 지표 (네트워크 모드에서는 /metrics, stdio 모드에서는 get_server_stats 도구로 노출)
+metrics = MetricsRegistry()
+UPSTREAM_SECONDS = metrics.histogram(
+    "weather_upstream_request_seconds", "OpenWeatherMap 요청 지연 시간", ("endpoint", "status")
+)
+UPSTREAM_WAIT_SECONDS = metrics.histogram(
+    "weather_upstream_wait_seconds", "업스트림 승인 대기 시간 (거절된 요청 제외)", ("priority",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+UPSTREAM_IN_FLIGHT = metrics.gauge("weather_upstream_in_flight", "진행 중인 OpenWeatherMap 요청 수", ("endpoint",))
+REQUESTS_IN_FLIGHT = metrics.gauge("weather_requests_in_flight", "처리 중인 MCP 요청 수", ("kind",))
+TOOL_CALL_SECONDS = metrics.histogram("weather_tool_call_seconds", "도구 호출 처리 시간", ("tool", "outcome"))
+SERIALIZE_SECONDS = metrics.histogram(
+    "weather_serialize_seconds", "응답 JSON 직렬화 시간 (캐시 미스만)", ("kind",),
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05),
+)
+
+# 모든 OpenWeatherMap 호출이 공유하는 HTTP 클라이언트 (main()에서 생성)
+http_client: httpx.AsyncClient | None = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """공유 HTTP 클라이언트를 반환합니다. 아직 없으면 생성합니다."""
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = create_http_client()
+    return http_client
+
+# OpenWeatherMap 호출량 제한 (기본값은 무료 요금제 기준 분당 60회)
+upstream_limiter = UpstreamLimiter(
+    rate=float(os.getenv("WEATHER_UPSTREAM_RATE_PER_SECOND", "1.0")),
+    burst=int(os.getenv("WEATHER_UPSTREAM_BURST", "10")),
+    max_concurrency=int(os.getenv("WEATHER_UPSTREAM_MAX_CONCURRENCY", "10")),
+    max_queue=int(os.getenv("WEATHER_UPSTREAM_MAX_QUEUE", "100")),
+)
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+# 엔드포인트별 회로 차단기와 지연 시간 기반 헤지 요청 설정
+UPSTREAM_ENDPOINTS = ("weather", "forecast")
+circuit_breakers = {
+    endpoint: CircuitBreaker(
+        endpoint,
+        failure_threshold=int(os.getenv("WEATHER_CIRCUIT_FAILURE_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("WEATHER_CIRCUIT_RESET_SECONDS", "30")),
+    )
+    for endpoint in UPSTREAM_ENDPOINTS
+}
+hedgers = {
+    endpoint: Hedger(
+        enabled=_env_flag("WEATHER_HEDGE_ENABLED"),
+        percentile=float(os.getenv("WEATHER_HEDGE_PERCENTILE", "95")),
+        min_samples=int(os.getenv("WEATHER_HEDGE_MIN_SAMPLES", "20")),
+    )
+    for endpoint in UPSTREAM_ENDPOINTS
+}
+
+# (엔드포인트, 파라미터)별로 진행 중인 업스트림 요청 테이블
+upstream_flights = SingleFlight()
+
+async def fetch_upstream(
+    endpoint: str,
+    params: dict[str, Any],
+    priority: Priority = Priority.USER,
+) -> dict[str, Any]:
+    """OpenWeatherMap API를 호출합니다. 동일한 동시 요청은 한 번만 전송됩니다.
+
+    모든 호출은 속도 제한기를 거치며, 캐시 갱신은 `Priority.REFRESH`로 호출합니다.
+    엔드포인트의 회로가 열려 있으면 CircuitOpenError로 즉시 실패합니다.
+    """
+    breaker = circuit_breakers[endpoint]
+
+    async def attempt() -> httpx.Response:
+        queued = time.perf_counter()
+        async with upstream_limiter.acquire(priority):
+            started = time.perf_counter()
+            UPSTREAM_WAIT_SECONDS.labels(priority=priority.name.lower()).observe(started - queued)
+            status = "error"
+            try:
+                with UPSTREAM_IN_FLIGHT.track(endpoint=endpoint):
+                    response = await get_http_client().get(
+                        f"{API_BASE_URL}/{endpoint}",
+                        params={**params, **http_params}
+                    )
+                status = str(response.status_code)
+                return response
+            finally:
+                UPSTREAM_SECONDS.labels(endpoint=endpoint, status=status).observe(time.perf_counter() - started)
+
+    async def request() -> dict[str, Any]:
+        breaker.before_call()
+        try:
+            response = await hedgers[endpoint].run(attempt)
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # 취소나 승인 거절(UpstreamOverloadedError)처럼 업스트림 상태를 알 수 없는 결과:
+            # half-open 시험 호출 자리를 돌려주지 않으면 회로가 계속 열린 상태로 남습니다.
+            breaker.record_cancelled()
+            raise
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if response.status_code == 429:
+            # 할당량 초과: Retry-After 동안 모든 업스트림 호출을 멈춥니다.
+            retry_after = response.headers.get("Retry-After", "")
+            upstream_limiter.backoff(float(retry_after) if retry_after.isdigit() else 1.0)
+        response.raise_for_status()
+        return response.json()
+
+    key = (endpoint, tuple(sorted(params.items())))
+    return await upstream_flights.do(key, request)
+
 # 캐시 설정
-cache_timeout = timedelta(minutes=15)
-last_cache_time = None
-cached_weather = None
+# soft TTL이 지난 항목은 hard TTL까지 그대로 반환하면서 백그라운드에서 갱신합니다.
+cache_timeout = timedelta(minutes=int(os.getenv("WEATHER_CACHE_TTL_MINUTES", "15")))
+cache_hard_timeout = timedelta(minutes=int(os.getenv("WEATHER_CACHE_HARD_TTL_MINUTES", "60")))
+CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "256"))
 
-async def fetch_weather(city: str) -> dict[str, Any]:
-    """날씨 정보를 가져오며 캐싱을 적용합니다."""
-    global cached_weather, last_cache_time
-
-    now = datetime.now()
-    if (cached_weather is None or
-        last_cache_time is None or
-        now - last_cache_time > cache_timeout or
-        cached_weather.get("city") != city):
-
-        # 실제 API 호출
-        logger.info(f"{city}의 날씨 정보를 API로부터 가져옵니다.")
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_BASE_URL}/weather",
-                params={"q": city, **http_params}
-            )
-            response.raise_for_status()
-            data = response.json()
+# 최근 이 시간 안에 조회된 항목만 백그라운드 갱신 대상이 됩니다.
+refresh_access_window = timedelta(minutes=int(os.getenv("WEATHER_REFRESH_ACCESS_WINDOW_MINUTES", "30")))
+REFRESH_INTERVAL_SECONDS = float(os.getenv("WEATHER_REFRESH_INTERVAL_SECONDS", "60"))
+
+# 예보는 도시별로 전체 구간(5일 x 3시간 간격 = 40개)을 한 번만 가져옵니다.
+FORECAST_POINTS = 40
+FORECAST_UPDATE_INTERVAL = timedelta(hours=3)
+FORECAST_UPDATE_GRACE = timedelta(minutes=int(os.getenv("WEATHER_FORECAST_UPDATE_GRACE_MINUTES", "10")))
+
+# 도시별 현재 날씨 캐시와 도시별 전체 예보 캐시
+weather_cache = TTLCache(ttl=cache_timeout, max_entries=CACHE_MAX_ENTRIES, hard_ttl=cache_hard_timeout)
+forecast_cache = TTLCache(ttl=cache_timeout, max_entries=CACHE_MAX_ENTRIES, hard_ttl=cache_hard_timeout)
+
+# list_resources에 노출할 도시: 설정된 도시(항상)와 현재 캐시된 도시
+RESOURCE_PAGE_SIZE = int(os.getenv("WEATHER_RESOURCE_PAGE_SIZE", "100"))
+RESOURCE_CITIES = [DEFAULT_CITY, *(name.strip() for name in os.getenv("WEATHER_RESOURCE_CITIES", "").split(",") if name.strip())]
+resource_catalog = ResourceCatalog()
+resource_cities_pinned = False
+
+def pin_resource_cities() -> None:
+    """설정된 도시를 리소스 목록에 고정합니다.
+
+    도시 색인을 처음 필요할 때 불러오도록 모듈 로드 시가 아니라 첫 목록 요청 때 한 번 실행합니다.
+    """
+    global resource_cities_pinned
+    if resource_cities_pinned:
+        return
+    for name in RESOURCE_CITIES:
+        ref = resolve_city(name)
+        resource_catalog.pin(ref.key, ref.name)
+    resource_cities_pinned = True
+
+weather_cache.add_listener(
+    lambda key, value: resource_catalog.update(key, value["city"] if value is not None else None)
+)
+
+# 선택적 영속 캐시: 서버 재시작 후에도, 같은 호스트의 여러 프로세스 간에도 공유됩니다.
+CACHE_DB_PATH = os.getenv("WEATHER_CACHE_DB")
+persistent_store = SQLiteWeatherStore(CACHE_DB_PATH) if CACHE_DB_PATH else None
+# 이 기간보다 오래된 레코드는 쓰이지 않으므로 백그라운드 갱신 작업이 주기적으로 지웁니다.
+PERSIST_RETENTION = timedelta(hours=float(os.getenv("WEATHER_CACHE_DB_RETENTION_HOURS", "24")))
+PERSIST_PURGE_INTERVAL_SECONDS = float(os.getenv("WEATHER_CACHE_DB_PURGE_INTERVAL_SECONDS", "3600"))
+
+async def load_persisted(
+    kind: str,
+    key: Any,
+    cache: TTLCache,
+    ttl_for: Callable[[float], timedelta] | None = None,
+    decode: Callable[[Any], Any] | None = None,
+    newer_than: float | None = None,
+) -> tuple[Any | None, bool]:
+    """영속 저장소에서 레코드를 읽어 메모리 캐시에 채웁니다. (값, stale 여부)를 반환합니다.
+
+    `ttl_for`는 가져온 시각(epoch 초)으로부터 항목별 soft TTL을 계산하고,
+    `decode`는 저장된 JSON 레코드를 메모리 표현으로 되돌립니다. `newer_than`(epoch 초)을
+    지정하면 그 이후에 가져온 레코드만 사용합니다.
+    """
+    if persistent_store is None:
+        return None, False
+    try:
+        record = await asyncio.to_thread(persistent_store.get, kind, key)
+    except Exception as e:
+        logger.warning(f"영속 캐시 읽기 실패: {e}")
+        return None, False
+    if record is None:
+        return None, False
+
+    value, fetched_at = record
+    if newer_than is not None and fetched_at <= newer_than:
+        return None, False
+    ttl = ttl_for(fetched_at) if ttl_for else cache.ttl
+    age = max(time.time() - fetched_at, 0.0)
+    if age > (ttl + cache.hard_ttl - cache.ttl).total_seconds():
+        return None, False
+    if decode is not None:
+        value = decode(value)
+    cache.set(key, value, age=age, ttl=ttl)
+    logger.info(f"{key}의 데이터를 영속 캐시에서 불러왔습니다.")
+    return value, age > ttl.total_seconds()
+
+async def persist(kind: str, key: Any, value: Any, fetched_at: float | None = None) -> None:
+    """레코드를 영속 저장소에 기록합니다. 실패해도 요청 처리는 계속됩니다.
+
+    `fetched_at`은 로컬 캐시에 넣은 시각과 같게 넘겨야 다른 워커의 레코드와 비교할 수 있습니다.
+    """
+    if persistent_store is None:
+        return
+    try:
+        await asyncio.to_thread(persistent_store.put, kind, key, value, fetched_at)
+    except Exception as e:
+        logger.warning(f"영속 캐시 쓰기 실패: {e}")
 
-        cached_weather = {
-            "city": city,
+async def purge_persisted() -> None:
+    """보존 기간이 지난 영속 레코드를 지웁니다. 여러 워커가 동시에 실행해도 안전합니다."""
+    if persistent_store is None:
+        return
+    try:
+        removed = await asyncio.to_thread(persistent_store.purge, PERSIST_RETENTION.total_seconds())
+    except Exception as e:
+        logger.warning(f"영속 캐시 정리 실패: {e}")
+        return
+    if removed:
+        logger.info(f"영속 캐시에서 오래된 레코드 {removed}개를 지웠습니다.")
+
+# 같은 영속 저장소를 쓰는 여러 프로세스(워커) 사이에서 도시별 업스트림 호출을 합칩니다.
+shared_flight = (
+    CrossProcessFlight(persistent_store, lease_seconds=float(os.getenv("WEATHER_SHARED_FLIGHT_LEASE_SECONDS", "10")))
+    if persistent_store is not None and _env_flag("WEATHER_SHARED_FLIGHT", "true")
+    else None
+)
+load_flights = SingleFlight()
+# 로컬 항목의 경과 시간(monotonic)을 벽시계 시각으로 되돌릴 때 생기는 오차 허용치
+SHARED_FETCHED_AT_SLACK_SECONDS = 1.0
+
+async def load_shared(
+    kind: str,
+    key: Any,
+    cache: TTLCache,
+    load: Callable[[], Awaitable[Any]],
+    ttl_for: Callable[[float], timedelta] | None = None,
+    decode: Callable[[Any], Any] | None = None,
+) -> Any:
+    """`load`를 프로세스 간 단일 실행으로 감쌉니다.
+
+    다른 프로세스가 같은 키를 가져오는 중이면 기다렸다가 그 결과를 영속 저장소에서 읽습니다.
+    """
+    if shared_flight is None:
+        return await load()
+
+    # 교체하려는 로컬 항목보다 나중에 가져온 레코드만 결과로 씁니다. 그래야 다른 워커가 먼저
+    # 갱신한 레코드는 받아 쓰고, 갱신하려던 바로 그 레코드를 다시 읽어 호출을 건너뛰지는 않습니다.
+    # 로컬 항목이 없으면 아직 신선한 레코드는 모두 받아들입니다.
+    freshness = cache.freshness(key)
+    replacing = time.time() - freshness[0] + SHARED_FETCHED_AT_SLACK_SECONDS if freshness is not None else None
+
+    async def peek() -> Any | None:
+        value, stale = await load_persisted(kind, key, cache, ttl_for=ttl_for, decode=decode, newer_than=replacing)
+        return None if stale else value
+
+    return await load_flights.do((kind, key), lambda: shared_flight.do(f"{kind}:{key}", load, peek))
+
+# weather://{city}/current 리소스 구독 (값이 실제로 바뀐 경우에만 알림)
+subscriptions = SubscriptionRegistry(
+    min_interval=float(os.getenv("WEATHER_NOTIFY_MIN_INTERVAL_SECONDS", "60"))
+)
+
+def weather_changed(previous: dict[str, Any] | None, current: dict[str, Any]) -> bool:
+    """조회 시각을 제외한 날씨 값이 달라졌는지 확인합니다."""
+    if previous is None:
+        return False
+    return any(previous.get(name) != value for name, value in current.items() if name != "timestamp")
+
+# 진행 중인 백그라운드 갱신 작업 (키별로 하나만 실행)
+refresh_tasks: dict[tuple, asyncio.Task] = {}
+
+def schedule_refresh(key: tuple, load: Callable[[], Awaitable[Any]]) -> None:
+    """캐시 항목을 백그라운드에서 갱신합니다. 이미 갱신 중이면 무시합니다."""
+    if key in refresh_tasks:
+        return
+
+    async def refresh():
+        try:
+            await load()
+            logger.info(f"{key} 캐시를 백그라운드에서 갱신했습니다.")
+        except Exception as e:
+            logger.warning(f"{key} 캐시 백그라운드 갱신 실패, 기존 데이터를 유지합니다: {e}")
+        finally:
+            refresh_tasks.pop(key, None)
+
+    refresh_tasks[key] = asyncio.create_task(refresh())
+
+async def load_weather(ref: CityRef, priority: Priority = Priority.USER) -> dict[str, Any]:
+    """API로부터 현재 날씨를 가져와 캐시에 저장합니다."""
+    async def load() -> dict[str, Any]:
+        logger.info(f"{ref.name}의 날씨 정보를 API로부터 가져옵니다.")
+        data = await fetch_upstream("weather", ref.params, priority)
+
+        weather = {
+            "city": ref.name,
             "temperature": data["main"]["temp"],
             "conditions": data["weather"][0]["description"],
             "humidity": data["main"]["humidity"],
             "wind_speed": data["wind"]["speed"],
-            "timestamp": now.isoformat()
+            "timestamp": datetime.now().isoformat()
         }
-        last_cache_time = now
-    else:
-        logger.info(f"{city}의 캐시된 날씨 정보를 반환합니다.")
-
-    return cached_weather
-
-app = Server("weather-server")
-
-@app.list_resources()
-async def list_resources() -> list[Resource]:
-    """사용 가능한 날씨 리소스를 나열합니다."""
-    uri = AnyUrl(f"weather://{DEFAULT_CITY}/current")
-    return [
-        Resource(
-            uri=uri,
-            name=f"{DEFAULT_CITY}의 현재 날씨",
-            mimeType="application/json",
-            description="실시간 날씨 데이터"
+        fetched_at = time.time()
+        previous = weather_cache.peek(ref.key)
+        weather_cache.set(ref.key, weather)
+        if weather_changed(previous, weather):
+            subscriptions.notify(ref.key)
+        await persist("weather", ref.key, weather, fetched_at)
+        return weather
+
+    return await load_shared("weather", ref.key, weather_cache, load)
+
+async def fetch_weather(city: str) -> dict[str, Any]:
+    """날씨 정보를 가져오며 도시별 캐싱을 적용합니다. 도시 이름은 색인으로 정규화됩니다."""
+    ref = resolve_city(city)
+    cached, stale = weather_cache.lookup(ref.key)
+    if cached is None:
+        cached, stale = await load_persisted("weather", ref.key, weather_cache)
+    if cached is not None:
+        logger.info(f"{ref.name}의 캐시된 날씨 정보를 반환합니다.")
+        if stale:
+            schedule_refresh(("weather", ref.key), lambda: load_weather(ref, Priority.REFRESH))
+        return cached
+
+    try:
+        return await load_weather(ref)
+    except CircuitOpenError:
+        last_known = weather_cache.peek(ref.key)
+        if last_known is None:
+            raise
+        logger.warning(f"업스트림 회로가 열려 있어 {ref.name}의 마지막 날씨 정보를 반환합니다.")
+        return last_known
+
+def forecast_ttl(fetched_at: float) -> timedelta:
+    """OpenWeatherMap 예보 갱신 주기(UTC 기준 3시간)에 맞춘 soft TTL을 계산합니다.
+
+    갱신 시각 직후에는 새 예보가 아직 게시되지 않았을 수 있으므로 유예 시간을 더합니다.
+    """
+    interval = FORECAST_UPDATE_INTERVAL.total_seconds()
+    grace = FORECAST_UPDATE_GRACE.total_seconds()
+    next_update = ((fetched_at - grace) // interval + 1) * interval + grace
+    return timedelta(seconds=max(next_update - fetched_at, 60.0))
+
+async def load_forecast(ref: CityRef, priority: Priority = Priority.USER) -> ForecastSeries:
+    """API로부터 전체 예보 구간(5일, 3시간 간격)을 가져와 캐시에 저장합니다."""
+    async def load() -> ForecastSeries:
+        logger.info(f"{ref.name}의 전체 예보를 API로부터 가져옵니다.")
+        data = await fetch_upstream("forecast", {
+            **ref.params,
+            "cnt": FORECAST_POINTS,
+        }, priority)
+
+        series = ForecastSeries.from_response(data)
+        fetched_at = time.time()
+        forecast_cache.set(ref.key, series, ttl=forecast_ttl(fetched_at))
+        await persist("forecast", ref.key, series.to_dict(), fetched_at)
+        return series
+
+    return await load_shared(
+        "forecast", ref.key, forecast_cache, load, ttl_for=forecast_ttl, decode=ForecastSeries.from_dict
+    )
+
+async def fetch_forecast_series(city: str) -> ForecastSeries:
+    """도시의 전체 예보 구간을 가져오며 도시별 캐싱을 적용합니다."""
+    ref = resolve_city(city)
+    cached, stale = forecast_cache.lookup(ref.key)
+    if cached is None:
+        cached, stale = await load_persisted(
+            "forecast", ref.key, forecast_cache, ttl_for=forecast_ttl, decode=ForecastSeries.from_dict
         )
-    ]
+    if cached is not None:
+        logger.info(f"{ref.name}의 캐시된 예보를 사용합니다.")
+        if stale:
+            schedule_refresh(("forecast", ref.key), lambda: load_forecast(ref, Priority.REFRESH))
+        return cached
+
+    try:
+        return await load_forecast(ref)
+    except CircuitOpenError:
+        last_known = forecast_cache.peek(ref.key)
+        if last_known is None:
+            raise
+        logger.warning(f"업스트림 회로가 열려 있어 {ref.name}의 마지막 예보를 반환합니다.")
+        return last_known
+
+async def fetch_forecast(city: str, days: int) -> list[dict[str, Any]]:
+    """일별 날씨 예보(최저/최고/평균 기온, 대표 날씨)를 반환합니다.
+
+    일별 집계는 예보를 가져올 때 한 번만 계산되어 캐시되므로 여기서는 잘라내기만 합니다.
+    """
+    series = await fetch_forecast_series(city)
+    return series.daily_forecast(days)
+
+# 응답 직렬화 설정 (compact: 들여쓰기 없음 + 짧은 키, 기본값은 기존과 같은 pretty)
+serializer = PayloadSerializer(
+    compact=os.getenv("WEATHER_OUTPUT_FORMAT", "pretty").lower() == "compact",
+    use_orjson=_env_flag("WEATHER_FAST_JSON", "true"),
+)
+COMPACT_LEGEND = "응답 키: c=도시, t=기온, tn=최저, tx=최고, w=날씨, h=습도, ws=풍속, ts=시각, d=날짜, r=결과, e=오류"
+
+def describe(text: str) -> str:
+    """compact 모드이면 도구 설명에 짧은 키 범례를 덧붙입니다."""
+    return f"{text}. {COMPACT_LEGEND}" if serializer.compact else text
+
+def dump_payload(kind: str, obj: Any, inline: bool = False) -> str:
+    with SERIALIZE_SECONDS.labels(kind=kind).time():
+        return serializer.dumps(obj, inline)
+
+async def render_weather(city: str, inline: bool = False) -> str:
+    """현재 날씨를 JSON 문자열로 반환합니다. 직렬화 결과는 캐시 항목과 함께 재사용됩니다."""
+    ref = resolve_city(city)
+    weather = await fetch_weather(city)
+    return weather_cache.memoize(ref.key, weather, ("weather", inline), lambda: dump_payload("weather", weather, inline))
+
+async def render_forecast(city: str, days: int, inline: bool = False) -> str:
+    """일별 예보를 JSON 문자열로 반환합니다. 직렬화 결과는 캐시 항목과 함께 재사용됩니다."""
+    ref = resolve_city(city)
+    series = await fetch_forecast_series(city)
+    return forecast_cache.memoize(
+        ref.key, series, ("daily", days, inline), lambda: dump_payload("forecast", series.daily_forecast(days), inline)
+    )
+
+async def refresh_hot_entries() -> None:
+    """최근 조회된 항목을 soft TTL 만료 전에 주기적으로 갱신하고, 영속 캐시의 오래된 레코드를 정리합니다."""
+    # 다음 주기 전에 stale 상태가 될 항목을 미리 갱신합니다.
+    horizon = timedelta(seconds=REFRESH_INTERVAL_SECONDS)
+    last_purge = float("-inf")
+    while True:
+        await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
+        if time.monotonic() - last_purge >= PERSIST_PURGE_INTERVAL_SECONDS:
+            last_purge = time.monotonic()
+            await purge_persisted()
+        index = get_city_index()
+        # 구독 중인 도시는 조회가 없어도 계속 갱신합니다.
+        for key in subscriptions.keys():
+            if not weather_cache.touch(key):
+                ref = index.from_key(key)
+                schedule_refresh(("weather", key), lambda ref=ref: load_weather(ref, Priority.REFRESH))
+        for key in weather_cache.hot_keys(refresh_access_window, horizon):
+            ref = index.from_key(key)
+            schedule_refresh(("weather", key), lambda ref=ref: load_weather(ref, Priority.REFRESH))
+        for key in forecast_cache.hot_keys(refresh_access_window, horizon):
+            ref = index.from_key(key)
+            schedule_refresh(("forecast", key), lambda ref=ref: load_forecast(ref, Priority.REFRESH))
+
+# 현재 연결(Server.run 한 번)에서 구독한 세션들. 연결이 끝나면 그 구독을 정리합니다.
+connection_sessions: ContextVar[set[Any] | None] = ContextVar("connection_sessions", default=None)
+
+class WeatherServer(Server):
+    """리소스 구독 지원을 capability에 알리는 MCP 서버.
+
+    기본 Server는 구독 핸들러를 등록해도 `resources.subscribe`를 false로 보고합니다.
+    구독 해제 없이 연결이 끊겨도 그 연결의 구독은 연결 종료 시 제거됩니다.
+    """
+
+    async def run(self, *args: Any, **kwargs: Any) -> None:
+        sessions: set[Any] = set()
+        token = connection_sessions.set(sessions)
+        try:
+            await super().run(*args, **kwargs)
+        finally:
+            connection_sessions.reset(token)
+            for session in sessions:
+                subscriptions.drop_session(session)
+
+    def get_capabilities(
+        self,
+        notification_options: NotificationOptions,
+        experimental_capabilities: dict[str, dict[str, Any]],
+    ) -> ServerCapabilities:
+        capabilities = super().get_capabilities(notification_options, experimental_capabilities)
+        if capabilities.resources is not None and SubscribeRequest in self.request_handlers:
+            capabilities.resources.subscribe = True
+        return capabilities
+
+app = WeatherServer("weather-server")
+
+def city_resource(key: str, name: str) -> Resource:
+    """도시의 현재 날씨 리소스를 만듭니다. 캐시 신선도는 설명과 `_meta`로 알려줍니다."""
+    freshness = weather_cache.freshness(key)
+    if freshness is None:
+        state, age, detail = "uncached", None, "캐시되지 않음"
+    else:
+        age, state = freshness
+        detail = f"캐시됨: {state}, {int(age)}초 전 갱신"
+    return Resource(
+        uri=AnyUrl(f"weather://{quote(name)}/current"),
+        name=f"{name}의 현재 날씨",
+        mimeType="application/json",
+        description=f"실시간 날씨 데이터 ({detail})",
+        # Resource에 정의되지 않은 정보는 MCP가 확장용으로 예약한 _meta에 담습니다.
+        **{"_meta": {"freshness": state, "ageSeconds": round(age, 1) if age is not None else None}},
+    )
+
+async def list_resources(cursor: str | None = None) -> ListResourcesResult:
+    """설정된 도시와 캐시된 도시의 날씨 리소스를 이름순으로 한 페이지씩 나열합니다."""
+    pin_resource_cities()
+    entries, next_cursor = resource_catalog.page(cursor, RESOURCE_PAGE_SIZE)
+    return ListResourcesResult(
+        resources=[city_resource(key, name) for key, name in entries],
+        nextCursor=next_cursor,
+    )
+
+async def handle_list_resources(request: ListResourcesRequest) -> ServerResult:
+    # 기본 list_resources 데코레이터는 커서를 전달하지 않으므로 직접 등록합니다.
+    cursor = request.params.cursor if request.params else None
+    return ServerResult(await list_resources(cursor))
+
+app.request_handlers[ListResourcesRequest] = handle_list_resources
+
+def parse_weather_uri(uri: AnyUrl) -> str:
+    """weather://{city}/current URI에서 도시 이름을 꺼냅니다."""
+    if str(uri).startswith("weather://") and str(uri).endswith("/current"):
+        # 한글 등 비ASCII 도시 이름은 퍼센트 인코딩되어 전달됩니다.
+        return unquote(str(uri).split("/")[-2])
+    raise ValueError(f"알 수 없는 리소스: {uri}")
 
 @app.read_resource()
 async def read_resource(uri: AnyUrl) -> str:
     """도시의 현재 날씨 데이터를 읽습니다."""
-    if str(uri).startswith("weather://") and str(uri).endswith("/current"):
-        city = str(uri).split("/")[-2]
-    else:
-        raise ValueError(f"알 수 없는 리소스: {uri}")
-
+    city = parse_weather_uri(uri)
     try:
-        weather_data = await fetch_weather(city)
-        return json.dumps(weather_data, indent=2, ensure_ascii=False)
+        with REQUESTS_IN_FLIGHT.track(kind="resource"):
+            return await render_weather(city)
     except httpx.HTTPError as e:
         raise RuntimeError(f"날씨 API 오류: {str(e)}")
 
+@app.subscribe_resource()
+async def subscribe_resource(uri: AnyUrl) -> None:
+    """도시 날씨 리소스를 구독합니다. 값이 바뀌면 resources/updated 알림을 보냅니다."""
+    city = parse_weather_uri(uri)
+    ref = resolve_city(city)
+    session = app.request_context.session
+    subscriptions.subscribe(ref.key, str(uri), session)
+    sessions = connection_sessions.get()
+    if sessions is not None:
+        sessions.add(session)
+    logger.info(f"{ref.name} 날씨 리소스 구독: {uri}")
+    try:
+        # 캐시를 채워 두면 이후 백그라운드 갱신 대상이 됩니다.
+        await fetch_weather(city)
+    except Exception as e:
+        logger.warning(f"{ref.name} 구독 시 초기 조회 실패: {e}")
+
+@app.unsubscribe_resource()
+async def unsubscribe_resource(uri: AnyUrl) -> None:
+    """도시 날씨 리소스 구독을 해제합니다."""
+    ref = resolve_city(parse_weather_uri(uri))
+    subscriptions.unsubscribe(ref.key, str(uri), app.request_context.session)
+
+# 구독 핸들러. 요청마다 세션이 사라지는 stateless HTTP 모드에서는 등록을 해제합니다.
+subscription_handlers = {request_type: app.request_handlers[request_type] for request_type in (SubscribeRequest, UnsubscribeRequest)}
+
+def set_subscriptions_enabled(enabled: bool) -> None:
+    """리소스 구독 지원을 켜거나 끕니다. 끄면 capability에서도 `subscribe`가 빠집니다."""
+    for request_type, handler in subscription_handlers.items():
+        if enabled:
+            app.request_handlers[request_type] = handler
+        else:
+            app.request_handlers.pop(request_type, None)
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """사용 가능한 날씨 관련 도구들을 나열합니다."""
-    return [
+    tools = [
         Tool(
             name="get_forecast",
-            description="도시의 날씨 예보를 가져옵니다",
+            description=describe("도시의 날씨 예보를 가져옵니다"),
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -130,54 +655,183 @@ async def list_tools() -> list[Tool]:
                 },
                 "required": ["city"]
             }
+        ),
+        Tool(
+            name="get_weather_batch",
+            description=describe("여러 도시의 현재 날씨(또는 days 지정 시 예보)를 한 번에 가져옵니다"),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "cities": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "도시 이름 목록 (예: [\"Seoul\", \"Busan\"])",
+                        "minItems": 1,
+                        "maxItems": BATCH_MAX_CITIES
+                    },
+                    "days": {
+                        "type": "number",
+                        "description": "예보 일수 (1-5일). 생략하면 현재 날씨를 반환합니다",
+                        "minimum": 1,
+                        "maximum": 5
+                    }
+                },
+                "required": ["cities"]
+            }
         )
     ]
+    if stats_tool_enabled:
+        tools.append(
+            Tool(
+                name="get_server_stats",
+                description="날씨 서버의 캐시, 업스트림 지연 시간, 도구 호출 지표를 가져옵니다",
+                inputSchema={"type": "object", "properties": {}}
+            )
+        )
+    return tools
 
-@app.call_tool()
-async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageContent | EmbeddedResource]:
-    """날씨 예보 도구를 호출합니다."""
-    if name != "get_forecast":
-        raise ValueError(f"알 수 없는 도구: {name}")
+async def fetch_city_batch(cities: list[str], days: int | None) -> dict[str, Any]:
+    """여러 도시의 날씨를 제한된 동시성으로 가져옵니다. 도시별 오류는 따로 모읍니다.
+
+    결과는 도시별로 이미 직렬화된 JSON 조각이며, 캐시된 조각을 그대로 재사용합니다.
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    results: dict[str, str] = {}
+    errors: dict[str, str] = {}
+
+    async def fetch_one(city: str) -> None:
+        async with semaphore:
+            try:
+                if days is None:
+                    results[city] = await render_weather(city, inline=True)
+                else:
+                    results[city] = await render_forecast(city, days, inline=True)
+            except httpx.HTTPStatusError as e:
+                errors[city] = f"HTTP {e.response.status_code}"
+            except Exception as e:
+                errors[city] = str(e) or type(e).__name__
+
+    await asyncio.gather(*(fetch_one(city) for city in cities))
+    # 요청한 도시 순서를 유지합니다.
+    return {
+        "results": {city: results[city] for city in cities if city in results},
+        "errors": {city: errors[city] for city in cities if city in errors},
+    }
 
+async def call_get_forecast(arguments: Any) -> list[TextContent]:
+    """get_forecast 도구: 한 도시의 일별 예보를 반환합니다."""
     if not isinstance(arguments, dict) or "city" not in arguments:
         raise ValueError("잘못된 예보 인수: 'city'가 필요합니다.")
 
     city = arguments["city"]
-    days = min(int(arguments.get("days", 3)), 5)
+    days = max(1, min(int(arguments.get("days", 3)), 5))
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_BASE_URL}/forecast",
-                params={
-                    "q": city,
-                    "cnt": days * 8,  # 3시간 간격 데이터
-                    **http_params,
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-
-        forecasts = []
-        # 일별 예보를 위해 8개 데이터 포인트(24시간)마다 하나씩 추출
-        for i in range(0, len(data["list"]), 8):
-            day_data = data["list"][i]
-            forecasts.append({
-                "date": day_data["dt_txt"].split()[0],
-                "temperature": day_data["main"]["temp"],
-                "conditions": day_data["weather"][0]["description"]
-            })
-
         return [
             TextContent(
                 type="text",
-                text=json.dumps(forecasts, indent=2, ensure_ascii=False)
+                text=await render_forecast(city, days)
             )
         ]
     except httpx.HTTPError as e:
         logger.error(f"날씨 예보 API 오류: {str(e)}")
         raise RuntimeError(f"날씨 예보 API 오류: {str(e)}")
 
+async def call_get_weather_batch(arguments: Any) -> list[TextContent]:
+    """get_weather_batch 도구: 여러 도시의 날씨를 한 번에 반환합니다."""
+    if not isinstance(arguments, dict) or not isinstance(arguments.get("cities"), list):
+        raise ValueError("잘못된 배치 인수: 'cities' 목록이 필요합니다.")
+
+    # 중복과 빈 문자열을 제거하되 순서는 유지합니다.
+    cities = list(dict.fromkeys(str(c).strip() for c in arguments["cities"] if str(c).strip()))
+    if not cities:
+        raise ValueError("잘못된 배치 인수: 도시가 하나 이상 필요합니다.")
+    if len(cities) > BATCH_MAX_CITIES:
+        raise ValueError(f"잘못된 배치 인수: 도시는 최대 {BATCH_MAX_CITIES}개까지 요청할 수 있습니다.")
+
+    days = arguments.get("days")
+    if days is not None:
+        days = max(1, min(int(days), 5))
+
+    payload = await fetch_city_batch(cities, days)
+    logger.info(f"배치 조회 완료: 성공 {len(payload['results'])}건, 실패 {len(payload['errors'])}건")
+    text = serializer.join_object({
+        serializer.key("results"): serializer.join_object(payload["results"]),
+        serializer.key("errors"): serializer.dumps(payload["errors"], inline=True),
+    })
+    return [TextContent(type="text", text=text)]
+
+def collect_component_metrics() -> list[Sample]:
+    """캐시, 승인 제어, 회로 차단기 등 구성 요소가 가진 통계를 지표로 변환합니다."""
+    samples: list[Sample] = []
+    for cache_name, cache in (("weather", weather_cache), ("forecast", forecast_cache)):
+        labels = {"cache": cache_name}
+        stats = cache.stats
+        samples += [
+            ("weather_cache_hits_total", "counter", "캐시 적중 (stale 포함)", labels, stats.hits),
+            ("weather_cache_stale_hits_total", "counter", "stale 캐시 적중", labels, stats.stale_hits),
+            ("weather_cache_misses_total", "counter", "캐시 실패", labels, stats.misses),
+            ("weather_cache_evictions_total", "counter", "LRU 축출", labels, stats.evictions),
+            ("weather_cache_expirations_total", "counter", "hard TTL 만료", labels, stats.expirations),
+            ("weather_cache_entries", "gauge", "캐시 항목 수", labels, len(cache)),
+        ]
+    limiter = upstream_limiter.metrics()
+    samples += [
+        ("weather_upstream_queue_depth", "gauge", "업스트림 승인 대기열 길이", {}, limiter["queue_depth"]),
+        ("weather_upstream_admitted_total", "counter", "승인된 업스트림 요청", {}, limiter["admitted"]),
+        ("weather_upstream_wait_max_seconds", "gauge", "가장 길었던 승인 대기 시간", {}, limiter["wait_max_seconds"]),
+    ]
+    samples += [
+        ("weather_upstream_shed_total", "counter", "대기열 초과로 거절된 요청", {"priority": priority}, count)
+        for priority, count in limiter["shed"].items()
+    ]
+    for endpoint in UPSTREAM_ENDPOINTS:
+        breaker = circuit_breakers[endpoint]
+        labels = {"endpoint": endpoint}
+        samples += [
+            ("weather_circuit_open", "gauge", "회로가 열려 있으면 1", labels, int(breaker.state != CircuitBreaker.CLOSED)),
+            ("weather_circuit_rejected_total", "counter", "회로 차단으로 거절된 요청", labels, breaker.rejected),
+            ("weather_hedged_requests_total", "counter", "헤지 요청 수", labels, hedgers[endpoint].hedged),
+        ]
+    samples.append(("weather_upstream_coalesced_total", "counter", "합쳐진 동시 업스트림 요청", {}, upstream_flights.coalesced))
+    samples.append(("weather_subscriptions", "gauge", "리소스 구독 수", {}, len(subscriptions)))
+    return samples
+
+metrics.register_collector(collect_component_metrics)
+
+# get_server_stats 도구 노출 여부 (stdio 모드에서는 main()이 켭니다)
+stats_tool_enabled = _env_flag("WEATHER_STATS_TOOL")
+
+async def call_get_server_stats(arguments: Any) -> list[TextContent]:
+    """get_server_stats 도구: 서버 지표 요약을 반환합니다."""
+    return [TextContent(type="text", text=dump_payload("stats", metrics.snapshot()))]
+
+@app.call_tool()
+async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageContent | EmbeddedResource]:
+    """날씨 관련 도구를 호출합니다."""
+    handler = tool_handlers().get(name)
+    if handler is None:
+        raise ValueError(f"알 수 없는 도구: {name}")
+
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with REQUESTS_IN_FLIGHT.track(kind="tool"):
+            result = await handler(arguments)
+        outcome = "ok"
+        return result
+    finally:
+        TOOL_CALL_SECONDS.labels(tool=name, outcome=outcome).observe(time.perf_counter() - started)
+
+def tool_handlers() -> dict[str, Callable[[Any], Awaitable[list[TextContent]]]]:
+    handlers = {
+        "get_forecast": call_get_forecast,
+        "get_weather_batch": call_get_weather_batch,
+    }
+    if stats_tool_enabled:
+        handlers["get_server_stats"] = call_get_server_stats
+    return handlers
+
 @app.set_logging_level()
 async def set_logging_level(level: LoggingLevel) -> EmptyResult:
     """로깅 레벨을 설정합니다."""
@@ -191,14 +845,65 @@ async def set_logging_level(level: LoggingLevel) -> EmptyResult:
     # )
     return EmptyResult()
 
-async def main():
-    """서버의 메인 실행 함수."""
-    from mcp.server.stdio import stdio_server
-
-    logger.info("날씨 정보 서버 시작")
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        ) 
\ No newline at end of file
+@asynccontextmanager
+async def serving() -> AsyncIterator[None]:
+    """공유 HTTP 클라이언트와 백그라운드 갱신 작업의 수명을 관리합니다.
+
+    stdio와 HTTP 전송 모두 이 컨텍스트 안에서 요청을 처리합니다.
+    """
+    global http_client
+
+    http_client = create_http_client()
+    refresher = asyncio.create_task(refresh_hot_entries())
+    try:
+        yield
+    finally:
+        refresher.cancel()
+        subscriptions.close()
+        for task in list(refresh_tasks.values()):
+            task.cancel()
+        logger.info(f"HTTP 연결 풀 통계: {pool_metrics(http_client)}")
+        logger.info(f"업스트림 승인 제어 통계: {upstream_limiter.metrics()}")
+        logger.info(f"리소스 구독 통계: {subscriptions.metrics()}")
+        if shared_flight is not None:
+            logger.info(f"프로세스 간 단일 실행 통계: {shared_flight.metrics()}")
+        for endpoint in UPSTREAM_ENDPOINTS:
+            logger.info(
+                f"{endpoint} 회로 차단기: {circuit_breakers[endpoint].metrics()}, "
+                f"헤지: {hedgers[endpoint].metrics()}"
+            )
+        await http_client.aclose()
+        if persistent_store is not None:
+            persistent_store.close()
+
+async def main(transport: str = "stdio", host: str = "127.0.0.1", port: int = 8001):
+    """서버의 메인 실행 함수.
+
+    `transport`가 "stdio"이면 표준 입출력으로 한 클라이언트를 처리하고,
+    "sse" 또는 "streamable-http"이면 여러 클라이언트가 하나의 프로세스(와 캐시)를
+    공유하도록 HTTP로 서비스합니다.
+    """
+    logger.info(
+        f"날씨 정보 서버 시작 (전송: {transport}, 출력 형식: {'compact' if serializer.compact else 'pretty'}, "
+        f"JSON 인코더: {serializer.encoder})"
+    )
+    if transport == "stdio":
+        from mcp.server.stdio import stdio_server
+
+        # stdio 모드에는 /metrics 엔드포인트가 없으므로 도구로 지표를 제공합니다.
+        global stats_tool_enabled
+        stats_tool_enabled = True
+
+        async with serving(), stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+        return
+
+    import uvicorn
+    from .transport import create_http_app
+
+    config = uvicorn.Config(create_http_app(transport), host=host, port=port, log_level="info")
+    await uvicorn.Server(config).serve()
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import uuid
+from typing import TYPE_CHECKING, Awaitable, Callable, Hashable, TypeVar
+
+if TYPE_CHECKING:
+    from .store import SQLiteWeatherStore
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """같은 키에 대한 동시 요청을 하나의 업스트림 호출로 합칩니다.
+
+    첫 호출자가 작업을 시작하고, 작업이 끝나기 전에 들어온 호출자들은 같은
+    결과(또는 예외)를 함께 기다립니다. 대기자 하나가 취소되어도 공유 작업은
+    취소되지 않습니다.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """`key`에 대해 진행 중인 작업이 있으면 합류하고, 없으면 `fn`을 실행합니다."""
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 모든 대기자가 취소된 경우에도 예외 미확인 경고가 남지 않도록 합니다.
+        if not task.cancelled():
+            task.exception()
+
+
+class CrossProcessFlight:
+    """SQLite 임대(lease)로 같은 호스트의 여러 프로세스 간 요청을 합칩니다.
+
+    임대를 얻은 프로세스만 `fn`을 실행해 결과를 공유 저장소에 기록하고, 나머지는
+    `peek`이 새 결과를 돌려줄 때까지 기다립니다. 임대 소유자가 실패하거나 멈추면
+    (임대 만료 후) 대기자 중 하나가 직접 가져옵니다.
+    """
+
+    def __init__(self, store: "SQLiteWeatherStore", lease_seconds: float = 10.0, poll_interval: float = 0.05):
+        self.store = store
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.leader = 0
+        self.follower = 0
+
+    async def do(self, name: str, fn: Callable[[], Awaitable[T]], peek: Callable[[], Awaitable[T | None]]) -> T:
+        owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        while not await asyncio.to_thread(self.store.acquire_lease, name, owner, self.lease_seconds):
+            await asyncio.sleep(self.poll_interval)
+            value = await peek()
+            if value is not None:
+                self.follower += 1
+                return value
+
+        try:
+            # 임대를 얻기 직전에 다른 프로세스가 가져왔을 수 있습니다.
+            value = await peek()
+            if value is not None:
+                self.follower += 1
+                return value
+            self.leader += 1
+            return await fn()
+        finally:
+            await asyncio.to_thread(self.store.release_lease, name, owner)
+
+    def metrics(self) -> dict[str, int]:
+        return {"leader": self.leader, "follower": self.follower}
@@ -0,0 +1,101 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Hashable
+
+
+class SQLiteWeatherStore:
+    """정규화된 날씨 레코드를 가져온 시각과 함께 보관하는 SQLite 저장소.
+
+    WAL 모드를 사용하므로 같은 호스트의 여러 서버 프로세스가 하나의 파일을
+    동시에 읽고 쓸 수 있습니다. 연결은 처음 사용할 때 열립니다.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS weather_records ("
+                " kind TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " PRIMARY KEY (kind, key))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " name TEXT PRIMARY KEY,"
+                " owner TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _encode_key(key: Hashable) -> str:
+        return json.dumps(key, ensure_ascii=False)
+
+    def get(self, kind: str, key: Hashable) -> tuple[Any, float] | None:
+        """(레코드, 가져온 시각의 epoch 초)를 반환합니다. 없으면 None입니다."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT payload, fetched_at FROM weather_records WHERE kind = ? AND key = ?",
+                (kind, self._encode_key(key)),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, kind: str, key: Hashable, value: Any, fetched_at: float | None = None) -> None:
+        """레코드를 저장합니다. 같은 키의 기존 레코드는 덮어씁니다."""
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO weather_records (kind, key, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                (kind, self._encode_key(key), payload, fetched_at if fetched_at is not None else time.time()),
+            )
+
+    def purge(self, older_than_seconds: float) -> int:
+        """가져온 지 오래된 레코드를 삭제하고 삭제된 개수를 반환합니다."""
+        with self._lock:
+            cursor = self._connection().execute(
+                "DELETE FROM weather_records WHERE fetched_at < ?",
+                (time.time() - older_than_seconds,),
+            )
+        return cursor.rowcount
+
+    def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        """`name`에 대한 임대를 얻으면 True를 반환합니다.
+
+        다른 소유자의 임대가 아직 유효하면 실패합니다. 임대는 `ttl_seconds` 후 만료되므로
+        소유 프로세스가 비정상 종료되어도 영구히 잠기지 않습니다.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._connection().execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at"
+                " WHERE leases.expires_at <= ? OR leases.owner = excluded.owner",
+                (name, owner, now + ttl_seconds, now),
+            )
+        return cursor.rowcount == 1
+
+    def release_lease(self, name: str, owner: str) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
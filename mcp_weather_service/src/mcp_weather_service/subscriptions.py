@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from pydantic import AnyUrl
+
+logger = logging.getLogger("weather-server")
+
+
+class SubscriptionRegistry:
+    """리소스 구독자(세션)를 캐시 키별로 관리하고 변경 알림을 보냅니다.
+
+    같은 키의 알림은 `min_interval` 초에 한 번으로 제한되며, 그 사이에 들어온
+    변경은 하나의 지연 알림으로 합쳐집니다. 연결이 끝난 세션(`drop_session`)과
+    전송에 실패한 세션은 구독 목록에서 제거합니다.
+    """
+
+    def __init__(self, min_interval: float = 60.0):
+        self.min_interval = min_interval
+        # 키 -> {세션: 그 세션이 구독한 URI 집합}
+        self._subscribers: dict[str, dict[Any, set[str]]] = {}
+        self._last_sent: dict[str, float] = {}
+        self._pending: dict[str, asyncio.Task] = {}
+        # 지표
+        self.sent = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return sum(len(uris) for sessions in self._subscribers.values() for uris in sessions.values())
+
+    def keys(self) -> list[str]:
+        return list(self._subscribers)
+
+    def subscribe(self, key: str, uri: str, session: Any) -> None:
+        self._subscribers.setdefault(key, {}).setdefault(session, set()).add(uri)
+
+    def unsubscribe(self, key: str, uri: str, session: Any) -> None:
+        sessions = self._subscribers.get(key)
+        if not sessions or session not in sessions:
+            return
+        sessions[session].discard(uri)
+        if not sessions[session]:
+            del sessions[session]
+        if not sessions:
+            del self._subscribers[key]
+
+    def drop_session(self, session: Any) -> None:
+        """세션의 모든 구독을 제거합니다. 연결이 끊기면 호출됩니다."""
+        for key in list(self._subscribers):
+            sessions = self._subscribers[key]
+            sessions.pop(session, None)
+            if not sessions:
+                del self._subscribers[key]
+
+    def notify(self, key: str) -> None:
+        """`key`의 데이터가 바뀌었음을 구독자에게 알립니다. 최소 간격 안이면 지연시킵니다."""
+        if key not in self._subscribers:
+            return
+        if key in self._pending:
+            self.coalesced += 1
+            return
+        last = self._last_sent.get(key)
+        delay = 0.0 if last is None else max(last + self.min_interval - time.monotonic(), 0.0)
+        self._pending[key] = asyncio.create_task(self._send_after(key, delay))
+
+    async def _send_after(self, key: str, delay: float) -> None:
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+        finally:
+            self._pending.pop(key, None)
+        self._last_sent[key] = time.monotonic()
+        for session, uris in list(self._subscribers.get(key, {}).items()):
+            for uri in list(uris):
+                try:
+                    await session.send_resource_updated(AnyUrl(uri))
+                    self.sent += 1
+                except Exception as e:
+                    logger.info(f"구독 알림 전송 실패, 세션의 구독을 해제합니다: {e}")
+                    self.drop_session(session)
+                    break
+
+    def close(self) -> None:
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+
+    def metrics(self) -> dict[str, int]:
+        return {"subscriptions": len(self), "sent": self.sent, "coalesced": self.coalesced}
@@ -0,0 +1,140 @@
+import contextlib
+import logging
+import os
+import shutil
+import tempfile
+from typing import AsyncIterator
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Mount, Route
+from starlette.types import Receive, Scope, Send
+
+from . import server
+
+logger = logging.getLogger("weather-server")
+
+TRANSPORTS = ("stdio", "sse", "streamable-http")
+HTTP_TRANSPORTS = TRANSPORTS[1:]
+
+
+def create_http_app(transport: str, stateless: bool = False) -> Starlette:
+    """날씨 MCP 서버를 HTTP로 제공하는 ASGI 앱을 만듭니다.
+
+    - "sse": GET /sse 로 이벤트 스트림을 열고 POST /messages/ 로 요청을 보냅니다.
+    - "streamable-http": /mcp 엔드포인트 하나로 요청과 응답 스트림을 처리합니다.
+
+    두 방식 모두 GET /metrics 로 Prometheus 형식의 지표를 제공합니다.
+
+    모든 연결은 같은 프로세스의 캐시, 연결 풀, 속도 제한기를 공유합니다.
+    `stateless`이면 요청마다 세션을 새로 만들어 어느 워커가 받아도 처리할 수 있습니다.
+    """
+    if transport == "sse":
+        return _create_sse_app()
+    if transport == "streamable-http":
+        return _create_streamable_http_app(stateless)
+    raise ValueError(f"지원하지 않는 HTTP 전송 방식: {transport} (가능한 값: {', '.join(HTTP_TRANSPORTS)})")
+
+
+async def handle_metrics(_: Request) -> Response:
+    """Prometheus 텍스트 형식의 지표. 워커 모드에서는 요청을 받은 워커의 지표입니다."""
+    return PlainTextResponse(server.metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def _create_sse_app() -> Starlette:
+    from mcp.server.sse import SseServerTransport
+
+    sse = SseServerTransport("/messages/")
+
+    async def handle_sse(request: Request) -> Response:
+        async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+            await server.app.run(read_stream, write_stream, server.app.create_initialization_options())
+        return Response()
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_: Starlette) -> AsyncIterator[None]:
+        async with server.serving():
+            yield
+
+    return Starlette(
+        routes=[
+            Route("/sse", endpoint=handle_sse, methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message),
+            Route("/metrics", endpoint=handle_metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def _create_streamable_http_app(stateless: bool) -> Starlette:
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+    # stateless 모드의 세션은 요청이 끝나면 사라지므로 구독 알림을 보낼 곳이 없습니다.
+    server.set_subscriptions_enabled(not stateless)
+    session_manager = StreamableHTTPSessionManager(app=server.app, stateless=stateless)
+
+    async def handle_mcp(scope: Scope, receive: Receive, send: Send) -> None:
+        await session_manager.handle_request(scope, receive, send)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_: Starlette) -> AsyncIterator[None]:
+        async with server.serving(), session_manager.run():
+            yield
+
+    return Starlette(
+        routes=[
+            Mount("/mcp", app=handle_mcp),
+            Route("/metrics", endpoint=handle_metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def create_app_from_env() -> Starlette:
+    """워커 프로세스용 앱 팩토리. 설정은 run_workers()가 넘긴 환경 변수에서 읽습니다."""
+    return create_http_app(
+        os.getenv("WEATHER_TRANSPORT", "streamable-http"),
+        stateless=server._env_flag("WEATHER_STATELESS_HTTP"),
+    )
+
+
+def run_workers(transport: str, host: str, port: int, workers: int) -> None:
+    """여러 워커 프로세스로 HTTP 전송을 실행합니다.
+
+    워커들은 SQLite 영속 캐시를 공유하고 도시별 업스트림 호출을 임대로 합칩니다.
+    SSE는 연결과 메시지 요청이 같은 프로세스에 도착해야 하므로 지원하지 않습니다.
+    """
+    import uvicorn
+
+    if transport != "streamable-http":
+        raise ValueError("여러 워커는 streamable-http 전송에서만 사용할 수 있습니다")
+
+    # 경로를 지정하지 않으면 이 실행 전용 임시 디렉터리를 만들어, 같은 호스트의 다른 서버와
+    # 캐시나 임대를 공유하지 않게 하고 종료할 때 지웁니다.
+    cache_dir = None
+    if not os.getenv("WEATHER_CACHE_DB"):
+        cache_dir = tempfile.mkdtemp(prefix="mcp_weather_")
+        os.environ["WEATHER_CACHE_DB"] = os.path.join(cache_dir, "cache.db")
+    logger.info(f"워커 간 공유 캐시: {os.environ['WEATHER_CACHE_DB']}")
+
+    # 업스트림 호출 한도는 호스트 전체 기준이므로 워커 수로 나눕니다.
+    rate = float(os.getenv("WEATHER_UPSTREAM_RATE_PER_SECOND", "1.0"))
+    burst = int(os.getenv("WEATHER_UPSTREAM_BURST", "10"))
+    os.environ["WEATHER_UPSTREAM_RATE_PER_SECOND"] = str(rate / workers)
+    os.environ["WEATHER_UPSTREAM_BURST"] = str(max(1, burst // workers))
+
+    os.environ["WEATHER_TRANSPORT"] = transport
+    os.environ["WEATHER_STATELESS_HTTP"] = "true"
+    try:
+        uvicorn.run(
+            "mcp_weather_service.transport:create_app_from_env",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            log_level="info",
+        )
+    finally:
+        if cache_dir is not None:
+            shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,98 @@
+import importlib.util
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger("weather-server")
+
+
+@dataclass
+class HttpClientConfig:
+    """OpenWeatherMap 호출용 공유 HTTP 클라이언트 설정."""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 3.0
+    read_timeout: float = 10.0
+    pool_timeout: float = 5.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> "HttpClientConfig":
+        """WEATHER_HTTP_* 환경 변수로부터 설정을 읽습니다."""
+        return cls(
+            max_connections=int(os.getenv("WEATHER_HTTP_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(os.getenv("WEATHER_HTTP_MAX_KEEPALIVE", cls.max_keepalive_connections)),
+            keepalive_expiry=float(os.getenv("WEATHER_HTTP_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            connect_timeout=float(os.getenv("WEATHER_HTTP_CONNECT_TIMEOUT", cls.connect_timeout)),
+            read_timeout=float(os.getenv("WEATHER_HTTP_READ_TIMEOUT", cls.read_timeout)),
+            pool_timeout=float(os.getenv("WEATHER_HTTP_POOL_TIMEOUT", cls.pool_timeout)),
+            http2=os.getenv("WEATHER_HTTP2", "false").lower() in ("1", "true", "yes"),
+        )
+
+
+class PoolStats:
+    """공유 클라이언트를 통해 나간 요청 수를 집계합니다."""
+
+    def __init__(self):
+        self.requests = 0
+        self.responses = 0
+
+    async def on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+
+    async def on_response(self, response: httpx.Response) -> None:
+        self.responses += 1
+
+
+def create_http_client(config: HttpClientConfig | None = None) -> httpx.AsyncClient:
+    """연결 풀과 keep-alive가 설정된 장수명 AsyncClient를 생성합니다."""
+    config = config or HttpClientConfig.from_env()
+
+    http2 = config.http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2를 사용하려면 'httpx[http2]'가 필요합니다. HTTP/1.1로 동작합니다.")
+        http2 = False
+
+    stats = PoolStats()
+    client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            config.read_timeout,
+            connect=config.connect_timeout,
+            pool=config.pool_timeout,
+        ),
+        http2=http2,
+        event_hooks={"request": [stats.on_request], "response": [stats.on_response]},
+    )
+    client.pool_stats = stats
+    return client
+
+
+def pool_metrics(client: httpx.AsyncClient | None) -> dict[str, Any]:
+    """연결 풀의 현재 상태와 누적 요청 수를 반환합니다."""
+    if client is None:
+        return {"open": False}
+
+    stats = getattr(client, "pool_stats", None)
+    metrics: dict[str, Any] = {
+        "open": not client.is_closed,
+        "requests": stats.requests if stats else None,
+        "responses": stats.responses if stats else None,
+    }
+
+    # httpcore 연결 풀은 공개 API가 없으므로 가능한 경우에만 조회합니다.
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is not None:
+        metrics["connections"] = len(connections)
+        metrics["idle_connections"] = sum(1 for conn in connections if conn.is_idle())
+        metrics["http2_connections"] = sum(1 for conn in connections if "HTTP/2" in conn.info())
+    return metrics
@@ -0,0 +1,130 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+from mcp_weather_service.cache import TTLCache
+
+
+def test_get_returns_stored_value():
+    """저장한 값을 그대로 반환하고 적중 횟수를 기록하는지 테스트합니다."""
+    cache = TTLCache(ttl=timedelta(minutes=1))
+    cache.set("Seoul", {"temperature": 20})
+
+    assert cache.get("Seoul") == {"temperature": 20}
+    assert cache.get("Busan") is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+def test_expired_entry_is_a_miss(monkeypatch):
+    """TTL이 지난 항목은 실패로 처리되는지 테스트합니다."""
+    cache = TTLCache(ttl=timedelta(seconds=10))
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set("Seoul", 1)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get("Seoul") is None
+    assert "Seoul" not in cache
+    assert cache.stats.expirations == 1
+    # 만료된 값도 축출 전까지는 마지막 값으로 조회할 수 있습니다.
+    assert cache.peek("Seoul") == 1
+
+
+def test_lru_eviction():
+    """최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목이 축출되는지 테스트합니다."""
+    cache = TTLCache(ttl=timedelta(minutes=1), max_entries=2)
+    cache.set("Seoul", 1)
+    cache.set("Busan", 2)
+    cache.get("Seoul")
+    cache.set("Tokyo", 3)
+
+    assert "Busan" not in cache
+    assert "Seoul" in cache
+    assert "Tokyo" in cache
+    assert cache.stats.evictions == 1
+
+
+def test_invalid_max_entries():
+    with pytest.raises(ValueError):
+        TTLCache(ttl=timedelta(minutes=1), max_entries=0)
+
+
+def test_stale_entry_served_until_hard_ttl(monkeypatch):
+    """soft TTL과 hard TTL 사이에는 stale 값을 반환하는지 테스트합니다."""
+    cache = TTLCache(ttl=timedelta(seconds=10), hard_ttl=timedelta(seconds=60))
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set("Seoul", 1)
+
+    assert cache.lookup("Seoul") == (1, False)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 30)
+    assert cache.lookup("Seoul") == (1, True)
+    assert cache.stats.stale_hits == 1
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert cache.lookup("Seoul") == (None, False)
+
+
+def test_hot_keys_only_include_recently_accessed(monkeypatch):
+    """최근에 조회된 오래된 항목만 갱신 대상으로 선택되는지 테스트합니다."""
+    cache = TTLCache(ttl=timedelta(seconds=10), hard_ttl=timedelta(seconds=600))
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set("Seoul", 1)
+    cache.set("Busan", 2)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 100)
+    cache.get("Seoul")
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 120)
+    assert cache.hot_keys(timedelta(seconds=60), timedelta(seconds=10)) == ["Seoul"]
+
+
+def test_per_entry_ttl_keeps_stale_window(monkeypatch):
+    """항목별 TTL을 지정해도 stale 허용 구간의 길이가 유지되는지 테스트합니다."""
+    cache = TTLCache(ttl=timedelta(seconds=10), hard_ttl=timedelta(seconds=30))
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set("Seoul", 1, ttl=timedelta(seconds=100))
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 50)
+    assert cache.lookup("Seoul") == (1, False)
+    monkeypatch.setattr(time, "monotonic", lambda: now + 110)
+    assert cache.lookup("Seoul") == (1, True)
+    monkeypatch.setattr(time, "monotonic", lambda: now + 121)
+    assert cache.lookup("Seoul") == (None, False)
+
+
+def test_memoize_reuses_rendering_until_value_changes():
+    """직렬화 결과는 항목이 교체될 때까지 재사용되는지 테스트합니다."""
+    cache = TTLCache(ttl=timedelta(minutes=1))
+    value = {"temperature": 20}
+    cache.set("Seoul", value)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return f"rendered-{len(builds)}"
+
+    assert cache.memoize("Seoul", value, "json", build) == "rendered-1"
+    assert cache.memoize("Seoul", value, "json", build) == "rendered-1"
+
+    cache.set("Seoul", {"temperature": 21})
+    assert cache.memoize("Seoul", value, "json", build) == "rendered-2"
+    assert len(builds) == 2
+
+
+def test_listeners_follow_stores_and_evictions():
+    """저장, 축출, 무효화가 리스너에 전달되는지 테스트합니다."""
+    cache = TTLCache(ttl=timedelta(minutes=1), max_entries=1)
+    events = []
+    cache.add_listener(lambda key, value: events.append((key, value)))
+
+    cache.set("Seoul", 1)
+    cache.set("Busan", 2)
+    cache.invalidate("Busan")
+
+    assert events == [("Seoul", 1), ("Busan", 2), ("Seoul", None), ("Busan", None)]
@@ -0,0 +1,34 @@
+import pytest
+
+from mcp_weather_service.catalog import ResourceCatalog
+
+
+def test_pages_are_stable_when_entries_change_between_requests():
+    """페이지 사이에 항목이 추가·제거되어도 다음 페이지가 어긋나지 않는지 테스트합니다."""
+    catalog = ResourceCatalog()
+    for index in range(5):
+        catalog.update(str(index), f"City {index}")
+
+    first, cursor = catalog.page(None, 2)
+    assert first == [("0", "City 0"), ("1", "City 1")]
+
+    catalog.update("0", None)
+    catalog.update("9", "Aaa")
+    second, cursor = catalog.page(cursor, 2)
+    assert second == [("2", "City 2"), ("3", "City 3")]
+
+    last, cursor = catalog.page(cursor, 2)
+    assert last == [("4", "City 4")]
+    assert cursor is None
+
+
+def test_pinned_city_survives_removal():
+    catalog = ResourceCatalog()
+    catalog.pin("1835848", "Seoul")
+    catalog.update("1835848", None)
+    assert catalog.page(None, 10) == ([("1835848", "Seoul")], None)
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        ResourceCatalog().page("not-a-cursor", 10)
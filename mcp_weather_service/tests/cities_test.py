@@ -0,0 +1,50 @@
+from mcp_weather_service.cities import get_city_index, normalize_city_name, resolve_city
+
+
+def test_normalize_city_name():
+    assert normalize_city_name("  New   York ") == "new york"
+    assert normalize_city_name("SEOUL") == "seoul"
+
+
+def test_aliases_resolve_to_same_city():
+    """영어/한국어 이름과 국가 코드 표기가 같은 도시 ID로 해석되는지 테스트합니다."""
+    refs = [resolve_city(name) for name in ["Seoul", "SEOUL", "서울", "서울특별시", "Seoul,KR", "seoul, kr"]]
+
+    assert {ref.key for ref in refs} == {"1835848"}
+    assert all(ref.params == {"id": 1835848} for ref in refs)
+    assert all(ref.name == "Seoul" for ref in refs)
+
+
+def test_unknown_city_falls_back_to_name_query():
+    """색인에 없는 도시는 정규화된 이름을 키로, 원래 이름을 q 파라미터로 사용하는지 테스트합니다."""
+    ref = resolve_city("  Reykjavik ")
+
+    assert ref.key == "reykjavik"
+    assert ref.params == {"q": "Reykjavik"}
+    assert ref.city is None
+
+
+def test_other_country_is_not_resolved_to_indexed_city():
+    """같은 이름이라도 국가 코드가 다르면 색인된 도시가 아니라 q 파라미터로 조회하는지 테스트합니다."""
+    london, paris = resolve_city("London,CA"), resolve_city("Paris, US")
+
+    assert london.params == {"q": "London,CA"}
+    assert paris.params == {"q": "Paris, US"}
+    assert london.city is None and paris.city is None
+    assert resolve_city("London,GB").params == {"id": 2643743}
+
+
+def test_from_key_roundtrip():
+    index = get_city_index()
+    ref = resolve_city("부산")
+
+    assert index.from_key(ref.key) == ref
+
+
+def test_from_key_keeps_unindexed_display_name():
+    """색인에 없는 도시도 캐시 키로부터 원래 표시 이름과 q 파라미터를 되살리는지 테스트합니다."""
+    index = get_city_index()
+    ref = resolve_city("Kathmandu")
+
+    assert index.from_key(ref.key) == ref
+    assert index.from_key("kathmandu").params == {"q": "Kathmandu"}
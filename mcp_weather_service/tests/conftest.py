@@ -0,0 +1,5 @@
+import os
+
+# mcp_weather_service 패키지를 임포트하면 server 모듈이 함께 로드되므로
+# 어떤 테스트 모듈보다 먼저 API 키를 설정합니다.
+os.environ.setdefault("OPENWEATHER_API_KEY", "TEST_API_KEY")
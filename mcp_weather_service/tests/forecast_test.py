@@ -0,0 +1,75 @@
+from mcp_weather_service.forecast import ForecastSeries
+
+
+def make_item(dt, temp, humidity=50, wind=2.0, code=800, description="clear sky"):
+    return {
+        "dt": dt,
+        "main": {"temp": temp, "humidity": humidity},
+        "wind": {"speed": wind},
+        "weather": [{"id": code, "description": description}],
+    }
+
+
+# 2024-08-30 00:00:00 UTC
+DAY_START = 1724976000
+
+
+def test_daily_aggregation_uses_all_points_of_the_day():
+    """일별 최저/최고/평균 기온과 대표 날씨를 그날의 모든 데이터로 계산하는지 테스트합니다."""
+    data = {
+        "list": [
+            make_item(DAY_START, 20.0, humidity=40, wind=1.0),
+            make_item(DAY_START + 10800, 24.0, humidity=60, wind=3.0, code=500, description="light rain"),
+            make_item(DAY_START + 21600, 28.0, humidity=80, wind=2.0, code=500, description="light rain"),
+            make_item(DAY_START + 86400, 18.0),
+        ],
+        "city": {"timezone": 0},
+    }
+
+    series = ForecastSeries.from_response(data)
+
+    assert len(series) == 4
+    assert series.daily_forecast(5) == [
+        {
+            "date": "2024-08-30",
+            "temperature": 24.0,
+            "temp_min": 20.0,
+            "temp_max": 28.0,
+            "humidity": 60.0,
+            "wind_speed": 3.0,
+            "conditions": "light rain",
+        },
+        {
+            "date": "2024-08-31",
+            "temperature": 18.0,
+            "temp_min": 18.0,
+            "temp_max": 18.0,
+            "humidity": 50.0,
+            "wind_speed": 2.0,
+            "conditions": "clear sky",
+        },
+    ]
+    assert len(series.daily_forecast(1)) == 1
+
+
+def test_days_are_grouped_by_city_local_time():
+    """도시의 시간대 기준으로 날짜를 나누는지 테스트합니다."""
+    data = {
+        # UTC 15:00 = 서울(UTC+9) 다음 날 00:00
+        "list": [make_item(DAY_START + 12 * 3600, 20.0), make_item(DAY_START + 15 * 3600, 22.0)],
+        "city": {"timezone": 32400},
+    }
+
+    daily = ForecastSeries.from_response(data).daily_forecast(5)
+
+    assert [day["date"] for day in daily] == ["2024-08-30", "2024-08-31"]
+
+
+def test_dict_roundtrip():
+    data = {"list": [make_item(DAY_START, 20.0), make_item(DAY_START + 10800, 22.0)], "city": {"timezone": 0}}
+    series = ForecastSeries.from_response(data)
+
+    restored = ForecastSeries.from_dict(series.to_dict())
+
+    assert restored.daily == series.daily
+    assert restored.timestamps == series.timestamps
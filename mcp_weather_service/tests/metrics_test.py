@@ -0,0 +1,35 @@
+from mcp_weather_service.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    """히스토그램이 누적 버킷, 합계, 개수로 내보내지는지 테스트합니다."""
+    registry = MetricsRegistry()
+    latency = registry.histogram("upstream_seconds", "지연 시간", ("endpoint",), buckets=(0.1, 1.0))
+    latency.labels(endpoint="weather").observe(0.05)
+    latency.labels(endpoint="weather").observe(0.5)
+    latency.labels(endpoint="weather").observe(5)
+
+    text = registry.render()
+
+    assert "# TYPE upstream_seconds histogram" in text
+    assert 'upstream_seconds_bucket{endpoint="weather",le="0.1"} 1' in text
+    assert 'upstream_seconds_bucket{endpoint="weather",le="1"} 2' in text
+    assert 'upstream_seconds_bucket{endpoint="weather",le="+Inf"} 3' in text
+    assert 'upstream_seconds_count{endpoint="weather"} 3' in text
+
+
+def test_counters_gauges_and_collectors():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "호출 수", ("tool",))
+    in_flight = registry.gauge("in_flight", "진행 중")
+    registry.register_collector(lambda: [("cache_hits_total", "counter", "적중", {"cache": "weather"}, 7)])
+
+    calls.labels(tool="get_forecast").inc()
+    with in_flight.track():
+        assert registry.snapshot()["in_flight"] == {"total": 1}
+
+    snapshot = registry.snapshot()
+    assert snapshot["calls_total"] == {"tool=get_forecast": 1}
+    assert snapshot["in_flight"] == {"total": 0}
+    assert snapshot["cache_hits_total"] == {"cache=weather": 7}
+    assert 'cache_hits_total{cache="weather"} 7' in registry.render()
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import pytest
+
+from mcp_weather_service.ratelimit import Priority, UpstreamLimiter, UpstreamOverloadedError
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped():
+    """동시에 승인되는 요청 수가 max_concurrency를 넘지 않는지 테스트합니다."""
+    limiter = UpstreamLimiter(rate=1000, burst=1000, max_concurrency=2, max_queue=10)
+    active = 0
+    peak = 0
+
+    async def call():
+        nonlocal active, peak
+        async with limiter.acquire():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.metrics()["admitted"] == 6
+    assert limiter.metrics()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    """버스트를 넘는 요청은 토큰이 채워질 때까지 기다리는지 테스트합니다."""
+    limiter = UpstreamLimiter(rate=50, burst=2, max_concurrency=10, max_queue=10)
+
+    async def call():
+        async with limiter.acquire():
+            pass
+
+    started = time.monotonic()
+    await asyncio.gather(*(call() for _ in range(4)))
+
+    # 버스트 2개 이후 나머지 2개는 50/s 속도로 승인됩니다.
+    assert time.monotonic() - started >= 0.03
+    assert limiter.metrics()["wait_max_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_user_requests_run_before_refresh():
+    """대기열에서 사용자 요청이 갱신 요청보다 먼저 승인되는지 테스트합니다."""
+    limiter = UpstreamLimiter(rate=1000, burst=1000, max_concurrency=1, max_queue=10)
+    order = []
+    release = asyncio.Event()
+
+    async def holder():
+        async with limiter.acquire():
+            await release.wait()
+
+    async def call(name, priority):
+        async with limiter.acquire(priority):
+            order.append(name)
+
+    first = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    refresh = asyncio.create_task(call("refresh", Priority.REFRESH))
+    await asyncio.sleep(0)
+    user = asyncio.create_task(call("user", Priority.USER))
+    await asyncio.sleep(0)
+
+    release.set()
+    await asyncio.gather(first, refresh, user)
+
+    assert order == ["user", "refresh"]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_immediately():
+    """대기열이 가득 차면 기다리지 않고 즉시 거절하는지 테스트합니다."""
+    limiter = UpstreamLimiter(rate=1000, burst=1000, max_concurrency=1, max_queue=2)
+    release = asyncio.Event()
+
+    async def call(priority=Priority.USER):
+        async with limiter.acquire(priority):
+            await release.wait()
+
+    tasks = [asyncio.create_task(call()) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    # 갱신 요청은 대기열의 절반까지만 사용할 수 있습니다.
+    with pytest.raises(UpstreamOverloadedError):
+        await call(Priority.REFRESH)
+    with pytest.raises(UpstreamOverloadedError):
+        await call()
+    assert limiter.metrics()["shed"] == {"user": 1, "refresh": 1}
+
+    release.set()
+    await asyncio.gather(*tasks)
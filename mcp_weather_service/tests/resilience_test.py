@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from mcp_weather_service.resilience import CircuitBreaker, CircuitOpenError, Hedger, LatencyTracker
+
+
+def test_circuit_opens_after_consecutive_failures(monkeypatch):
+    """연속 실패 후 회로가 열리고, 재설정 시간 뒤 시험 호출 하나만 허용하는지 테스트합니다."""
+    breaker = CircuitBreaker("forecast", failure_threshold=2, reset_timeout=10)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.metrics()["state"] == "open"
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    breaker.before_call()  # half-open 시험 호출
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.metrics() == {"state": "closed", "consecutive_failures": 0, "opened": 1, "rejected": 2}
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker()
+    for value in range(1, 101):
+        tracker.record(value / 100)
+
+    assert tracker.percentile(95) == 0.95
+    assert tracker.percentile(50) == 0.5
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_wins_when_first_is_slow():
+    """첫 시도가 임계값보다 느리면 헤지 요청을 보내고 먼저 끝난 결과를 쓰는지 테스트합니다."""
+    hedger = Hedger(enabled=True, percentile=95, min_samples=1)
+    hedger.latency.record(0.01)
+    delays = iter([1.0, 0.0])
+
+    async def attempt():
+        delay = next(delays)
+        await asyncio.sleep(delay)
+        return delay
+
+    assert await hedger.run(attempt) == 0.0
+    assert hedger.metrics()["hedged"] == 1
+    assert hedger.metrics()["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedging_disabled_by_default():
+    hedger = Hedger()
+    for _ in range(30):
+        hedger.latency.record(0.001)
+
+    async def attempt():
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    assert await hedger.run(attempt) == "ok"
+    assert hedger.hedged == 0
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from mcp_weather_service import serialization
+from mcp_weather_service.serialization import PayloadSerializer
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_pretty_output_matches_json_dumps(use_orjson):
+    """pretty 모드는 기존 json.dumps(indent=2) 출력과 같은지 테스트합니다."""
+    data = {"city": "서울", "temperature": 20.5, "forecast": [{"date": "2024-01-01"}]}
+    serializer = PayloadSerializer(use_orjson=use_orjson)
+
+    assert serializer.dumps(data) == json.dumps(data, indent=2, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_compact_output_uses_short_keys(use_orjson):
+    """compact 모드는 들여쓰기 없이 짧은 키를 사용하는지 테스트합니다."""
+    serializer = PayloadSerializer(compact=True, use_orjson=use_orjson)
+    text = serializer.dumps([{"date": "2024-01-01", "temp_min": 1.5, "conditions": "맑음"}])
+
+    assert text == '[{"d":"2024-01-01","tn":1.5,"w":"맑음"}]'
+    assert serializer.key("results") == "r"
+
+
+def test_falls_back_to_json_without_orjson(monkeypatch):
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert PayloadSerializer().encoder == "json"
+
+
+def test_join_object_splices_fragments():
+    """미리 직렬화된 조각을 다시 인코딩하지 않고 잇는지 테스트합니다."""
+    serializer = PayloadSerializer()
+    text = serializer.join_object({"서울": '{"t":1}', "Busan": "[]"})
+
+    assert json.loads(text) == {"서울": {"t": 1}, "Busan": []}
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from mcp_weather_service.singleflight import CrossProcessFlight, SingleFlight
+from mcp_weather_service.store import SQLiteWeatherStore
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    """같은 키의 동시 호출이 한 번만 실행되는지 테스트합니다."""
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(flights.do("Seoul", work) for _ in range(10)))
+
+    assert results == ["result"] * 10
+    assert calls == 1
+    assert flights.coalesced == 9
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_error_propagates_to_all_waiters():
+    """공유 작업의 예외가 모든 대기자에게 전달되는지 테스트합니다."""
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(*(flights.do("Seoul", fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_work():
+    """대기자 하나를 취소해도 다른 대기자는 결과를 받는지 테스트합니다."""
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return 42
+
+    first = asyncio.create_task(flights.do("Seoul", work))
+    second = asyncio.create_task(flights.do("Seoul", work))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    release.set()
+
+    assert await second == 42
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_cross_process_flight_runs_once_across_stores(tmp_path):
+    """같은 파일을 쓰는 여러 저장소(프로세스) 중 하나만 가져오고 나머지는 결과를 읽는지 테스트합니다."""
+    path = str(tmp_path / "cache.db")
+    flights = [CrossProcessFlight(SQLiteWeatherStore(path), poll_interval=0.005) for _ in range(3)]
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        flights[0].store.put("weather", "Seoul", {"temperature": 20})
+        return {"temperature": 20}
+
+    async def peek():
+        record = await asyncio.to_thread(flights[0].store.get, "weather", "Seoul")
+        return record[0] if record else None
+
+    results = await asyncio.gather(*(flight.do("weather:Seoul", work, peek) for flight in flights))
+
+    assert results == [{"temperature": 20}] * 3
+    assert calls == 1
+    assert sum(flight.follower for flight in flights) == 2
@@ -0,0 +1,55 @@
+import time
+
+from mcp_weather_service.store import SQLiteWeatherStore
+
+
+def test_put_and_get_roundtrip(tmp_path):
+    """저장한 레코드를 가져온 시각과 함께 다시 읽을 수 있는지 테스트합니다."""
+    store = SQLiteWeatherStore(str(tmp_path / "cache.db"))
+    store.put("weather", "Seoul", {"temperature": 20.5}, fetched_at=1000.0)
+    store.put("forecast", ("Seoul", 3), [{"date": "2024-08-30"}])
+
+    assert store.get("weather", "Seoul") == ({"temperature": 20.5}, 1000.0)
+    assert store.get("forecast", ("Seoul", 3))[0] == [{"date": "2024-08-30"}]
+    assert store.get("weather", "Busan") is None
+    store.close()
+
+
+def test_store_is_shared_between_connections(tmp_path):
+    """여러 프로세스처럼 별도 연결에서도 같은 데이터가 보이는지 테스트합니다."""
+    path = str(tmp_path / "cache.db")
+    writer = SQLiteWeatherStore(path)
+    reader = SQLiteWeatherStore(path)
+
+    writer.put("weather", "Seoul", {"temperature": 20.5})
+
+    value, fetched_at = reader.get("weather", "Seoul")
+    assert value == {"temperature": 20.5}
+    assert fetched_at <= time.time()
+    writer.close()
+    reader.close()
+
+
+def test_purge_removes_old_records(tmp_path):
+    store = SQLiteWeatherStore(str(tmp_path / "cache.db"))
+    store.put("weather", "Seoul", {}, fetched_at=time.time() - 7200)
+    store.put("weather", "Busan", {})
+
+    assert store.purge(older_than_seconds=3600) == 1
+    assert store.get("weather", "Seoul") is None
+    store.close()
+
+
+def test_lease_is_exclusive_until_released_or_expired(tmp_path):
+    """임대는 한 소유자만 얻을 수 있고, 해제되거나 만료되면 다시 얻을 수 있는지 테스트합니다."""
+    path = str(tmp_path / "cache.db")
+    first = SQLiteWeatherStore(path)
+    second = SQLiteWeatherStore(path)
+
+    assert first.acquire_lease("weather:1835848", "a", ttl_seconds=60)
+    assert not second.acquire_lease("weather:1835848", "b", ttl_seconds=60)
+    first.release_lease("weather:1835848", "a")
+    assert second.acquire_lease("weather:1835848", "b", ttl_seconds=-1)
+    assert first.acquire_lease("weather:1835848", "a", ttl_seconds=60)
+    first.close()
+    second.close()
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from mcp_weather_service.subscriptions import SubscriptionRegistry
+
+
+class FakeSession:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.updated: list[str] = []
+
+    async def send_resource_updated(self, uri):
+        if self.fail:
+            raise ConnectionError("closed")
+        self.updated.append(str(uri))
+
+
+@pytest.mark.asyncio
+async def test_notifications_are_rate_limited_and_coalesced():
+    """최소 간격 안의 변경은 하나의 지연 알림으로 합쳐지는지 테스트합니다."""
+    registry = SubscriptionRegistry(min_interval=0.05)
+    session = FakeSession()
+    registry.subscribe("1835848", "weather://Seoul/current", session)
+
+    registry.notify("1835848")
+    await asyncio.sleep(0)
+    registry.notify("1835848")
+    registry.notify("1835848")
+    assert session.updated == ["weather://Seoul/current"]
+
+    await asyncio.sleep(0.1)
+    assert session.updated == ["weather://Seoul/current"] * 2
+    assert registry.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_session_is_dropped_and_unsubscribe_stops_notifications():
+    registry = SubscriptionRegistry(min_interval=0)
+    broken, active = FakeSession(fail=True), FakeSession()
+    registry.subscribe("1835848", "weather://Seoul/current", broken)
+    registry.subscribe("1838524", "weather://Busan/current", active)
+
+    registry.notify("1835848")
+    await asyncio.sleep(0.01)
+    assert registry.keys() == ["1838524"]
+
+    registry.unsubscribe("1838524", "weather://Busan/current", active)
+    registry.notify("1838524")
+    await asyncio.sleep(0.01)
+    assert active.updated == []
+    assert len(registry) == 0
@@ -0,0 +1,86 @@
+import pytest
+from starlette.testclient import TestClient
+
+from mcp_weather_service.transport import create_http_app
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "test", "version": "0.1"},
+    },
+}
+
+
+def test_streamable_http_initialize():
+    """streamable HTTP 엔드포인트에서 세션을 초기화할 수 있는지 테스트합니다."""
+    with TestClient(create_http_app("streamable-http")) as client:
+        response = client.post(
+            "/mcp/",
+            json=INITIALIZE,
+            headers={"Accept": "application/json, text/event-stream"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers.get("mcp-session-id")
+    assert "weather-server" in response.text
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    with TestClient(create_http_app("streamable-http")) as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE weather_cache_hits_total counter" in response.text
+
+
+def test_unknown_transport_is_rejected():
+    with pytest.raises(ValueError):
+        create_http_app("websocket")
+
+
+def test_stateless_http_does_not_offer_subscriptions():
+    """stateless 모드에서는 구독 핸들러와 capability가 빠지는지 테스트합니다."""
+    from mcp.server import NotificationOptions
+    from mcp.types import SubscribeRequest
+
+    from mcp_weather_service import server
+
+    try:
+        create_http_app("streamable-http", stateless=True)
+        assert SubscribeRequest not in server.app.request_handlers
+        assert not server.app.get_capabilities(NotificationOptions(), {}).resources.subscribe
+    finally:
+        server.set_subscriptions_enabled(True)
+
+
+def test_workers_default_cache_db_is_unique_per_run(monkeypatch):
+    """WEATHER_CACHE_DB가 없으면 실행마다 다른 임시 DB를 쓰고 종료 후 지우는지 테스트합니다."""
+    import os
+
+    import uvicorn
+
+    from mcp_weather_service.transport import run_workers
+
+    for name in ("WEATHER_UPSTREAM_RATE_PER_SECOND", "WEATHER_UPSTREAM_BURST", "WEATHER_TRANSPORT", "WEATHER_STATELESS_HTTP"):
+        monkeypatch.setenv(name, os.environ.get(name, ""))
+    monkeypatch.setenv("WEATHER_UPSTREAM_RATE_PER_SECOND", "1.0")
+    monkeypatch.setenv("WEATHER_UPSTREAM_BURST", "10")
+    paths = []
+
+    def fake_run(*args, **kwargs):
+        path = os.environ["WEATHER_CACHE_DB"]
+        assert os.path.isdir(os.path.dirname(path))
+        paths.append(path)
+
+    monkeypatch.setattr(uvicorn, "run", fake_run)
+    for _ in range(2):
+        monkeypatch.delenv("WEATHER_CACHE_DB", raising=False)
+        run_workers("streamable-http", "127.0.0.1", 8000, 2)
+
+    assert paths[0] != paths[1]
+    assert not any(os.path.exists(os.path.dirname(path)) for path in paths)
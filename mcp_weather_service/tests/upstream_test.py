@@ -0,0 +1,38 @@
+import httpx
+import pytest
+import respx
+
+from mcp_weather_service.upstream import HttpClientConfig, create_http_client, pool_metrics
+
+
+def test_config_from_env(monkeypatch):
+    """환경 변수로 연결 풀 설정을 바꿀 수 있는지 테스트합니다."""
+    monkeypatch.setenv("WEATHER_HTTP_MAX_CONNECTIONS", "50")
+    monkeypatch.setenv("WEATHER_HTTP_READ_TIMEOUT", "2.5")
+    monkeypatch.setenv("WEATHER_HTTP2", "true")
+
+    config = HttpClientConfig.from_env()
+
+    assert config.max_connections == 50
+    assert config.read_timeout == 2.5
+    assert config.http2 is True
+    assert config.max_keepalive_connections == HttpClientConfig.max_keepalive_connections
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_shared_client_counts_requests():
+    """공유 클라이언트가 요청 수를 집계하고 종료 상태를 보고하는지 테스트합니다."""
+    respx.get("http://upstream.test/ping").mock(return_value=httpx.Response(200))
+    client = create_http_client(HttpClientConfig(read_timeout=1.0))
+
+    for _ in range(3):
+        await client.get("http://upstream.test/ping")
+
+    metrics = pool_metrics(client)
+    assert metrics["open"] is True
+    assert metrics["requests"] == 3
+    assert metrics["responses"] == 3
+
+    await client.aclose()
+    assert pool_metrics(client)["open"] is False
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import os
 from unittest.mock import Mock
@@ -10,6 +11,11 @@ import httpx
 os.environ["OPENWEATHER_API_KEY"] = "TEST_API_KEY"
 
 # 이제 server 모듈을 임포트합니다.
+from mcp_weather_service import server
+from mcp_weather_service.store import SQLiteWeatherStore
+from mcp_weather_service.cities import resolve_city
+from mcp_weather_service.ratelimit import UpstreamLimiter, UpstreamOverloadedError
+from mcp_weather_service.resilience import CircuitBreaker
 from mcp_weather_service.server import (
     fetch_weather,
     read_resource,
@@ -18,8 +24,24 @@ from mcp_weather_service.server import (
     list_tools,
     DEFAULT_CITY,
     API_BASE_URL,
+    weather_cache,
+    forecast_cache,
+    refresh_tasks,
+    cache_timeout,
+    forecast_ttl,
+    FORECAST_POINTS,
 )
 
+@pytest.fixture(autouse=True)
+def clear_caches(monkeypatch):
+    """테스트 간 캐시와 속도 제한 상태가 공유되지 않도록 초기화합니다."""
+    monkeypatch.setattr(server, "upstream_limiter", UpstreamLimiter(rate=1000, burst=1000, max_concurrency=100, max_queue=100))
+    monkeypatch.setattr(server, "circuit_breakers", {endpoint: CircuitBreaker(endpoint) for endpoint in server.UPSTREAM_ENDPOINTS})
+    weather_cache.clear()
+    forecast_cache.clear()
+    yield
+    refresh_tasks.clear()
+
 @pytest.fixture
 def mock_weather_response():
     """OpenWeatherMap API의 현재 날씨 응답 모의 데이터."""
@@ -92,12 +114,39 @@ async def test_fetch_weather(mock_weather_response):
 @pytest.mark.asyncio
 async def test_list_resources():
     """list_resources 함수가 기본 리소스를 올바르게 반환하는지 테스트합니다."""
-    resources = await list_resources()
-    assert len(resources) == 1
-    resource = resources[0]
+    result = await list_resources()
+    assert len(result.resources) == 1
+    assert result.nextCursor is None
+    resource = result.resources[0]
     assert str(resource.uri) == f"weather://{DEFAULT_CITY}/current"
     assert resource.name == f"{DEFAULT_CITY}의 현재 날씨"
     assert resource.mimeType == "application/json"
+    assert resource.model_dump(by_alias=True)["_meta"] == {"freshness": "uncached", "ageSeconds": None}
+    assert "freshness" not in resource.model_dump(by_alias=True)
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_list_resources_pages_through_cached_cities(mock_weather_response, monkeypatch):
+    """캐시된 도시가 신선도 정보와 함께 커서 단위로 나열되는지 테스트합니다."""
+    monkeypatch.setattr(server, "RESOURCE_PAGE_SIZE", 2)
+    respx.get(f"{API_BASE_URL}/weather").mock(return_value=httpx.Response(200, json=mock_weather_response))
+    for city in ["Busan", "Tokyo", "London"]:
+        await fetch_weather(city)
+
+    pages, cursor = [], None
+    while True:
+        result = await list_resources(cursor)
+        pages.append([resource.name for resource in result.resources])
+        cursor = result.nextCursor
+        if cursor is None:
+            break
+
+    assert pages == [["Busan의 현재 날씨", "London의 현재 날씨"], ["Seoul의 현재 날씨", "Tokyo의 현재 날씨"]]
+    busan = (await list_resources()).resources[0]
+    assert busan.model_extra["_meta"]["freshness"] == "fresh"
+
+    weather_cache.clear()
+    assert [r.name for r in (await list_resources()).resources] == [f"{DEFAULT_CITY}의 현재 날씨"]
 
 @pytest.mark.asyncio
 @respx.mock
@@ -114,12 +163,11 @@ async def test_read_resource(mock_weather_response):
 
 @pytest.mark.asyncio
 async def test_list_tools():
-    """list_tools 함수가 get_forecast 도구를 올바르게 반환하는지 테스트합니다."""
+    """list_tools 함수가 날씨 도구들을 올바르게 반환하는지 테스트합니다."""
     tools = await list_tools()
-    assert len(tools) == 1
-    tool = tools[0]
-    assert tool.name == "get_forecast"
-    assert "city" in tool.inputSchema["properties"]
+    assert [tool.name for tool in tools] == ["get_forecast", "get_weather_batch"]
+    assert "city" in tools[0].inputSchema["properties"]
+    assert "cities" in tools[1].inputSchema["properties"]
 
 @pytest.mark.asyncio
 @respx.mock
@@ -142,4 +190,335 @@ async def test_call_tool(mock_forecast_response):
     assert len(forecast_data) > 0
     assert "date" in forecast_data[0]
     assert "temperature" in forecast_data[0]
-    assert "conditions" in forecast_data[0] 
\ No newline at end of file
+    assert "conditions" in forecast_data[0]
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_fetch_weather_caches_per_city(mock_weather_response):
+    """도시를 번갈아 요청해도 도시별로 캐시가 적중하는지 테스트합니다."""
+    route = respx.get(f"{API_BASE_URL}/weather").mock(return_value=httpx.Response(200, json=mock_weather_response))
+
+    for city in ["Seoul", "Busan", "Seoul", "Busan"]:
+        weather = await fetch_weather(city)
+        assert weather["city"] == city
+
+    assert route.call_count == 2
+    assert weather_cache.stats.hits == 2
+    assert weather_cache.stats.misses == 2
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_concurrent_requests_are_coalesced(mock_weather_response):
+    """같은 도시에 대한 동시 요청이 업스트림 호출 한 번으로 합쳐지는지 테스트합니다."""
+    async def slow_response(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=mock_weather_response)
+
+    route = respx.get(f"{API_BASE_URL}/weather").mock(side_effect=slow_response)
+
+    results = await asyncio.gather(*(fetch_weather("Seoul") for _ in range(20)))
+
+    assert route.call_count == 1
+    assert all(r["temperature"] == 20.5 for r in results)
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stale_weather_served_while_refreshing(mock_weather_response):
+    """soft TTL이 지난 데이터를 즉시 반환하고 백그라운드에서 갱신하는지 테스트합니다."""
+    route = respx.get(f"{API_BASE_URL}/weather").mock(side_effect=lambda request: httpx.Response(200, json=mock_weather_response))
+    await fetch_weather("Seoul")
+
+    # 저장 시각을 soft TTL 이전으로 되돌려 stale 상태로 만듭니다.
+    weather_cache._entries[resolve_city("Seoul").key].stored_at -= cache_timeout.total_seconds() + 1
+    mock_weather_response["main"]["temp"] = 25.0
+
+    stale = await fetch_weather("Seoul")
+    assert stale["temperature"] == 20.5
+
+    await asyncio.gather(*refresh_tasks.values())
+    assert route.call_count == 2
+    assert (await fetch_weather("Seoul"))["temperature"] == 25.0
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_weather_survives_restart_with_persistent_store(tmp_path, monkeypatch, mock_weather_response):
+    """영속 캐시를 사용하면 메모리 캐시가 비어도 업스트림을 다시 호출하지 않는지 테스트합니다."""
+    monkeypatch.setattr(server, "persistent_store", SQLiteWeatherStore(str(tmp_path / "cache.db")))
+    route = respx.get(f"{API_BASE_URL}/weather").mock(return_value=httpx.Response(200, json=mock_weather_response))
+
+    first = await fetch_weather("Seoul")
+    weather_cache.clear()  # 재시작을 흉내냅니다.
+    second = await fetch_weather("Seoul")
+
+    assert route.call_count == 1
+    assert second == first
+    server.persistent_store.close()
+
+@pytest.mark.asyncio
+async def test_purge_persisted_removes_records_past_retention(tmp_path, monkeypatch):
+    """보존 기간이 지난 영속 레코드만 지우는지 테스트합니다."""
+    import time
+
+    store = SQLiteWeatherStore(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(server, "persistent_store", store)
+    store.put("weather", "old", {"city": "Old"}, fetched_at=time.time() - server.PERSIST_RETENTION.total_seconds() - 60)
+    store.put("weather", "new", {"city": "New"})
+
+    await server.purge_persisted()
+
+    assert store.get("weather", "old") is None
+    assert store.get("weather", "new") is not None
+    store.close()
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_refresh_with_shared_flight_calls_upstream(tmp_path, monkeypatch, mock_weather_response):
+    """프로세스 간 단일 실행을 써도 갱신은 방금 영속화된 레코드가 아니라 업스트림에서 가져오는지 테스트합니다."""
+    store = SQLiteWeatherStore(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(server, "persistent_store", store)
+    monkeypatch.setattr(server, "shared_flight", server.CrossProcessFlight(store, poll_interval=0.01))
+    temperatures = iter([20.5, 23.0])
+
+    def respond(request):
+        return httpx.Response(200, json={**mock_weather_response, "main": {"temp": next(temperatures), "humidity": 65}})
+
+    route = respx.get(f"{API_BASE_URL}/weather").mock(side_effect=respond)
+    await fetch_weather("Seoul")
+    refreshed = await server.load_weather(resolve_city("Seoul"), server.Priority.REFRESH)
+
+    assert route.call_count == 2
+    assert refreshed["temperature"] == 23.0
+    assert weather_cache.get(resolve_city("Seoul").key)["temperature"] == 23.0
+    store.close()
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_refresh_adopts_record_fetched_by_another_worker(tmp_path, monkeypatch):
+    """다른 워커가 로컬 항목보다 나중에 가져온 레코드가 있으면 갱신이 업스트림 대신 그것을 쓰는지 테스트합니다."""
+    import time
+
+    store = SQLiteWeatherStore(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(server, "persistent_store", store)
+    monkeypatch.setattr(server, "shared_flight", server.CrossProcessFlight(store, poll_interval=0.01))
+    ref = resolve_city("Seoul")
+    route = respx.get(f"{API_BASE_URL}/weather").mock(return_value=httpx.Response(500))
+
+    # 워커 B의 로컬 항목은 14분 전 것이고, 워커 A는 방금 같은 도시를 갱신해 영속화했습니다.
+    weather_cache.set(ref.key, {"city": "Seoul", "temperature": 18.0}, age=14 * 60)
+    store.put("weather", ref.key, {"city": "Seoul", "temperature": 23.0}, fetched_at=time.time() - 5)
+
+    refreshed = await server.load_weather(ref, server.Priority.REFRESH)
+
+    assert route.call_count == 0
+    assert refreshed["temperature"] == 23.0
+    assert weather_cache.freshness(ref.key)[1] == "fresh"
+    store.close()
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_call_tool_weather_batch(mock_weather_response):
+    """배치 도구가 도시별 결과와 도시별 오류를 한 번에 반환하는지 테스트합니다."""
+    def respond(request):
+        if request.url.params.get("q") == "Atlantis":
+            return httpx.Response(404, json={"cod": "404", "message": "city not found"})
+        return httpx.Response(200, json=mock_weather_response)
+
+    respx.get(f"{API_BASE_URL}/weather").mock(side_effect=respond)
+
+    results = await call_tool("get_weather_batch", {"cities": ["Seoul", "Atlantis", "Busan", "Seoul"]})
+    payload = json.loads(results[0].text)
+
+    assert list(payload["results"]) == ["Seoul", "Busan"]
+    assert payload["results"]["Busan"]["temperature"] == 20.5
+    assert payload["errors"] == {"Atlantis": "HTTP 404"}
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_repeated_reads_reuse_serialized_payload(mock_weather_response, monkeypatch):
+    """캐시 적중 시에는 다시 직렬화하지 않는지 테스트합니다."""
+    respx.get(f"{API_BASE_URL}/weather").mock(return_value=httpx.Response(200, json=mock_weather_response))
+    dumps = Mock(side_effect=server.serializer.dumps)
+    monkeypatch.setattr(server.serializer, "dumps", dumps)
+
+    first = await read_resource(AnyUrl("weather://Seoul/current"))
+    second = await read_resource(AnyUrl("weather://Seoul/current"))
+
+    assert second is first
+    assert dumps.call_count == 1
+
+def test_capabilities_advertise_resource_subscriptions():
+    from mcp.server import NotificationOptions
+    capabilities = server.app.get_capabilities(NotificationOptions(), {})
+    assert capabilities.resources.subscribe is True
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_subscriptions_dropped_when_connection_closes(mock_weather_response):
+    """구독 해제 없이 연결이 끝나도 그 연결의 구독이 제거되는지 테스트합니다."""
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    respx.get(f"{API_BASE_URL}/weather").mock(return_value=httpx.Response(200, json=mock_weather_response))
+    async with create_connected_server_and_client_session(server.app) as client:
+        await client.subscribe_resource(AnyUrl("weather://Seoul/current"))
+        assert server.subscriptions.keys() == [resolve_city("Seoul").key]
+
+    assert server.subscriptions.keys() == []
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_subscribers_are_notified_only_when_weather_changes(mock_weather_response, monkeypatch):
+    """갱신된 값이 실제로 바뀐 경우에만 구독자에게 알림을 보내는지 테스트합니다."""
+    notified = []
+    monkeypatch.setattr(server.subscriptions, "notify", notified.append)
+    temperatures = iter([20.5, 20.5, 23.0])
+
+    def respond(request):
+        return httpx.Response(200, json={**mock_weather_response, "main": {"temp": next(temperatures), "humidity": 65}})
+
+    respx.get(f"{API_BASE_URL}/weather").mock(side_effect=respond)
+    ref = resolve_city("Seoul")
+    for _ in range(3):
+        await server.load_weather(ref)
+
+    assert notified == [ref.key]
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_server_stats_tool_reports_cache_and_latency(mock_forecast_response, monkeypatch):
+    """stdio 모드의 get_server_stats 도구가 캐시와 지연 시간 지표를 보고하는지 테스트합니다."""
+    monkeypatch.setattr(server, "stats_tool_enabled", True)
+    respx.get(f"{API_BASE_URL}/forecast").mock(return_value=httpx.Response(200, json=mock_forecast_response))
+    await call_tool("get_forecast", {"city": "Seoul", "days": 1})
+    await call_tool("get_forecast", {"city": "Seoul", "days": 1})
+
+    assert "get_server_stats" in [tool.name for tool in await list_tools()]
+    stats = json.loads((await call_tool("get_server_stats", {}))[0].text)
+
+    assert stats["weather_cache_hits_total"]["cache=forecast"] == 1
+    assert stats["weather_upstream_request_seconds"]["endpoint=forecast,status=200"]["count"] >= 1
+    assert stats["weather_tool_call_seconds"]["tool=get_forecast,outcome=ok"]["count"] >= 2
+    assert stats["weather_upstream_wait_seconds"]["priority=user"]["count"] >= 1
+    assert "weather_upstream_wait_max_seconds" in stats
+
+@pytest.mark.asyncio
+async def test_call_tool_weather_batch_requires_cities():
+    with pytest.raises(ValueError):
+        await call_tool("get_weather_batch", {"cities": []})
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_forecast_fetched_once_for_all_day_ranges(mock_forecast_response):
+    """1, 3, 5일 예보 요청이 전체 구간 업스트림 호출 한 번으로 처리되는지 테스트합니다."""
+    # 3시간 간격 40개 데이터 포인트 (5일 이상)
+    base = mock_forecast_response["list"][0]
+    mock_forecast_response["list"] = [{**base, "dt": base["dt"] + i * 10800} for i in range(40)]
+    route = respx.get(f"{API_BASE_URL}/forecast").mock(return_value=httpx.Response(200, json=mock_forecast_response))
+
+    for days in (1, 3, 5):
+        results = await call_tool("get_forecast", {"city": "Seoul", "days": days})
+        assert len(json.loads(results[0].text)) == days
+
+    assert route.call_count == 1
+    assert route.calls.last.request.url.params["cnt"] == str(FORECAST_POINTS)
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_forecast_days_clamped_to_valid_range(mock_forecast_response):
+    """범위를 벗어난 days가 1-5일로 보정되는지 테스트합니다."""
+    base = mock_forecast_response["list"][0]
+    mock_forecast_response["list"] = [{**base, "dt": base["dt"] + i * 10800} for i in range(40)]
+    respx.get(f"{API_BASE_URL}/forecast").mock(return_value=httpx.Response(200, json=mock_forecast_response))
+
+    for days, expected in ((-3, 1), (-1, 1), (0, 1), (9, 5)):
+        results = await call_tool("get_forecast", {"city": "Seoul", "days": days})
+        assert len(json.loads(results[0].text)) == expected
+
+def test_forecast_ttl_aligned_to_update_cadence():
+    """예보 TTL이 다음 3시간 갱신 시각(+유예 시간)까지로 계산되는지 테스트합니다."""
+    boundary = 1_700_000_000 // 10800 * 10800  # 3시간 경계 (UTC)
+
+    # 갱신 직후 유예 시간 안에 가져온 데이터는 유예 시간이 끝나면 바로 갱신합니다.
+    assert forecast_ttl(boundary + 300).total_seconds() == 300
+    # 유예 시간이 지난 뒤 가져온 데이터는 다음 갱신 시각까지 유지합니다.
+    assert forecast_ttl(boundary + 3600).total_seconds() == 10800 - 3600 + 600
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_city_aliases_share_one_cache_entry(mock_weather_response):
+    """대소문자, 공백, 한국어 별칭이 같은 캐시 항목과 도시 ID 요청을 사용하는지 테스트합니다."""
+    route = respx.get(f"{API_BASE_URL}/weather").mock(return_value=httpx.Response(200, json=mock_weather_response))
+
+    for city in ["Seoul", "seoul", " Seoul ", "서울"]:
+        weather = await fetch_weather(city)
+        assert weather["city"] == "Seoul"
+
+    assert route.call_count == 1
+    assert route.calls.last.request.url.params["id"] == "1835848"
+    assert "q" not in route.calls.last.request.url.params
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_read_resource_decodes_korean_city(mock_weather_response):
+    """퍼센트 인코딩된 한글 도시 URI를 올바르게 해석하는지 테스트합니다."""
+    route = respx.get(f"{API_BASE_URL}/weather").mock(return_value=httpx.Response(200, json=mock_weather_response))
+
+    weather_data = json.loads(await read_resource(AnyUrl("weather://서울/current")))
+
+    assert weather_data["city"] == "Seoul"
+    assert route.calls.last.request.url.params["id"] == "1835848"
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_open_circuit_serves_last_known_weather(mock_weather_response):
+    """업스트림 장애로 회로가 열리면 즉시 실패하고 마지막으로 알려진 데이터를 반환하는지 테스트합니다."""
+    route = respx.get(f"{API_BASE_URL}/weather").mock(return_value=httpx.Response(200, json=mock_weather_response))
+    await fetch_weather("Seoul")
+    # hard TTL까지 지나 만료된 상태로 만듭니다.
+    weather_cache._entries[resolve_city("Seoul").key].stored_at -= 10 ** 6
+
+    route.mock(side_effect=httpx.ConnectTimeout("timeout"))
+    for _ in range(server.circuit_breakers["weather"].failure_threshold):
+        with pytest.raises(httpx.ConnectTimeout):
+            await fetch_weather("Seoul")
+    calls_before = route.call_count
+
+    weather = await fetch_weather("Seoul")
+
+    assert weather["temperature"] == 20.5
+    assert route.call_count == calls_before
+    assert server.circuit_breakers["weather"].metrics()["state"] == "open"
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_shed_half_open_trial_does_not_lock_circuit(mock_weather_response, monkeypatch):
+    """half-open 시험 호출이 승인 제어에서 거절되어도 다음 호출이 시험 호출이 될 수 있는지 테스트합니다."""
+    route = respx.get(f"{API_BASE_URL}/weather").mock(return_value=httpx.Response(200, json=mock_weather_response))
+    breaker = server.circuit_breakers["weather"]
+    breaker.state = CircuitBreaker.HALF_OPEN
+
+    # 대기열이 가득 찬 상태: 새 요청은 바로 거절됩니다.
+    monkeypatch.setattr(server, "upstream_limiter", UpstreamLimiter(rate=1000, burst=2, max_concurrency=1, max_queue=0))
+    server.upstream_limiter._admit()
+    with pytest.raises(UpstreamOverloadedError):
+        await fetch_weather("Seoul")
+
+    server.upstream_limiter._release()
+    weather = await fetch_weather("Seoul")
+
+    assert weather["temperature"] == 20.5
+    assert route.call_count == 1
+    assert breaker.metrics()["state"] == "closed"
+
+def test_city_index_not_loaded_at_import():
+    """서버 모듈을 불러오는 것만으로는 도시 색인을 읽지 않는지 테스트합니다."""
+    import subprocess
+    import sys
+
+    code = (
+        "from mcp_weather_service import server\n"
+        "from mcp_weather_service.cities import get_city_index\n"
+        "print(get_city_index.cache_info().currsize)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "0"